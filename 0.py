@@ -1,22 +1,568 @@
-from openai import OpenAI
-client = OpenAI(api_key="sk-ae694f881081476a94863e80c0759", base_url="https://api.deepseek.com")
-
-# Round 1
-messages = [{"role": "user", "content": "What's the highest mountain in the world?"}]
-response = client.chat.completions.create(
-    model="deepseek-chat",
-    messages=messages
-)
-
-messages.append(response.choices[0].message)
-print(f"Messages Round 1: {messages}")
-
-# Round 2
-messages.append({"role": "user", "content": "What is the second?"})
-response = client.chat.completions.create(
-    model="deepseek-chat",
-    messages=messages
-)
-
-messages.append(response.choices[0].message)
-print(f"Messages Round 2: {messages}")
\ No newline at end of file
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import hashlib
+import sqlite3
+import inspect
+import argparse
+import functools
+from collections import deque
+from openai import OpenAI, AsyncOpenAI, APIError, APIConnectionError, APIStatusError
+from openai.types.chat import ChatCompletion
+import instrument  # 计时埋点，设置 PYTOOLS_TRACE 后生效
+
+API_KEY = os.environ.get("DEEPSEEK_API_KEY", "sk-ae694f881081476a94863e80c0759")
+BASE_URL = os.environ.get("DEEPSEEK_BASE_URL", "https://api.deepseek.com")
+MODEL = "deepseek-chat"
+
+
+def estimate_tokens(text):
+    """粗略估算 token 数：中日韩字符约 1 字 1 token，其余约 4 字符 1 token"""
+    cjk = sum(1 for ch in text if ord(ch) >= 0x2E80)
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def truncate_tokens(text, max_tokens):
+    """截断文本使估算 token 数不超过 max_tokens，保留末尾（最新）的内容"""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    # 二分查找能保留的最长后缀
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if estimate_tokens("…" + text[len(text) - mid:]) <= max_tokens:
+            lo = mid
+        else:
+            hi = mid - 1
+    return "…" + text[len(text) - lo:] if lo else ""
+
+
+class ConversationHistory:
+    """
+    按 token 预算管理的对话历史
+    - 每条消息只保存为 {"role", "content"} 普通 dict，并记录估算的 token 数
+    - 超出预算时从最早的一轮开始丢弃；提供 summarizer 时把丢弃的内容合并进摘要
+    - 摘要最多占预算的 SUMMARY_SHARE，超出部分截断，保证每轮请求大小有上限
+    - system 消息始终保留；最新一条消息除非是开头落单的 assistant 消息，否则也保留
+    summarizer(previous_summary, dropped_messages) -> str
+    """
+
+    # 每条消息的格式开销（role、分隔符等）
+    MESSAGE_OVERHEAD = 4
+    SUMMARY_PREFIX = "Summary of the earlier conversation: "
+    SUMMARY_SHARE = 0.25
+
+    def __init__(self, budget=4000, system=None, summarizer=None):
+        self.budget = budget
+        self.summarizer = summarizer
+        self.system = None
+        self.summary = None
+        self.summary_text = None
+        self.messages = deque()
+        self.tokens = deque()
+        self.total = 0
+        if system:
+            self.system = {"role": "system", "content": system}
+            self.total += self.count(self.system)
+
+    def count(self, message):
+        return estimate_tokens(message["content"]) + self.MESSAGE_OVERHEAD
+
+    def append(self, role, content):
+        message = {"role": role, "content": content}
+        n = self.count(message)
+        self.messages.append(message)
+        self.tokens.append(n)
+        self.total += n
+        self.trim()
+
+    def pop(self):
+        """撤回最后一条消息（如请求失败时撤回刚加入的用户消息）"""
+        self.total -= self.tokens.pop()
+        return self.messages.pop()
+
+    def drop_oldest(self, dropped):
+        dropped.append(self.messages.popleft())
+        self.total -= self.tokens.popleft()
+
+    def trim(self):
+        while True:
+            dropped = []
+            while self.total > self.budget and len(self.messages) > 1:
+                self.drop_oldest(dropped)
+            # 历史不以 assistant 消息开头（包括只剩一条 assistant 消息的情况）
+            while self.messages and self.messages[0]["role"] == "assistant":
+                self.drop_oldest(dropped)
+            if not dropped or not self.summarizer:
+                return
+            # 摘要本身也计入预算；加入摘要后仍超出时继续丢弃，并把新丢弃的内容也合并进摘要
+            self.summarize(dropped)
+            if self.total <= self.budget:
+                return
+
+    def summarize(self, dropped):
+        if self.summary:
+            self.total -= self.count(self.summary)
+        limit = int(self.budget * self.SUMMARY_SHARE) - self.count({"content": self.SUMMARY_PREFIX})
+        self.summary_text = truncate_tokens(self.summarizer(self.summary_text, dropped), max(limit, 0))
+        self.summary = {"role": "system", "content": self.SUMMARY_PREFIX + self.summary_text}
+        self.total += self.count(self.summary)
+
+    def payload(self):
+        """返回本轮请求要发送的消息列表"""
+        head = [m for m in (self.system, self.summary) if m]
+        return head + list(self.messages)
+
+
+class ChatSession:
+    """
+    多轮对话会话
+    - 整个会话共用一个 OpenAI 客户端（底层 HTTP 连接池保持长连接，各轮复用）
+    - 流式接收回复，边到达边输出
+    - 每次调用记录首 token 延迟 (TTFT) 和 tokens/sec
+    - 历史由 ConversationHistory 按 token 预算裁剪，每轮请求大小有上限
+    base_url 可指向本地模拟服务器进行测试
+    """
+
+    def __init__(self, model=MODEL, api_key=API_KEY, base_url=BASE_URL, timeout=60.0, client=None,
+                 history_budget=4000, system=None, summarizer=None):
+        self.model = model
+        self.client = client or OpenAI(api_key=api_key, base_url=base_url, timeout=timeout)
+        self.history = ConversationHistory(history_budget, system=system, summarizer=summarizer)
+        self.stats = []
+
+    @property
+    def messages(self):
+        return self.history.payload()
+
+    def ask(self, content, out=sys.stdout, **params):
+        """
+        发送一条用户消息，流式输出回复并返回完整文本
+        请求失败（包括流中返回的 error 事件）时抛出 APIError 等异常，并撤回本轮的用户消息；
+        回复为空时同样不记入历史，避免历史中出现空的 assistant 消息或连续的 user 消息
+        """
+        self.history.append("user", content)
+        messages = self.history.payload()
+        try:
+            text, stat = self.stream_reply(messages, out, params)
+        except BaseException:
+            self.history.pop()
+            raise
+        if text:
+            # 回复只保存为普通 dict，避免把完整的响应对象带进后续请求
+            self.history.append("assistant", text)
+        else:
+            self.history.pop()
+        self.stats.append(stat)
+        instrument.record("chat.ask", stat["total"], **stat)
+        return text
+
+    def stream_reply(self, messages, out, params):
+        start = time.perf_counter()
+        first_token = None
+        parts = []
+        chunks = 0
+        usage = None
+
+        # 自行解析 SSE 并读到响应末尾：SDK 的 Stream 在 [DONE] 处提前关闭响应，
+        # 会导致底层连接无法放回连接池
+        with self.client.chat.completions.with_streaming_response.create(
+            model=self.model,
+            messages=messages,
+            stream=True,
+            stream_options={"include_usage": True},
+            **params,
+        ) as response:
+            for line in response.iter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    continue
+                chunk = json.loads(data)
+                error = chunk.get("error")
+                if error:
+                    # 与 SDK 的 Stream 一致：流中的 error 事件按 APIError 抛出
+                    message = error.get("message") if isinstance(error, dict) else None
+                    raise APIError(message or "An error occurred during streaming",
+                                   response.http_request, body=error)
+                if chunk.get("usage"):
+                    usage = chunk["usage"]
+                if not chunk.get("choices"):
+                    continue
+                delta = chunk["choices"][0].get("delta", {}).get("content")
+                if not delta:
+                    continue
+                if first_token is None:
+                    first_token = time.perf_counter()
+                chunks += 1
+                parts.append(delta)
+                if out is not None:
+                    out.write(delta)
+                    out.flush()
+        end = time.perf_counter()
+        if out is not None:
+            out.write("\n")
+
+        # 服务端未返回 usage 时，用内容分片数近似 token 数
+        tokens = usage["completion_tokens"] if usage else chunks
+        ttft = (first_token or end) - start
+        generation = end - (first_token or end)
+        stat = {
+            "prompt_tokens": sum(self.history.count(m) for m in messages),
+            "ttft": ttft,
+            "total": end - start,
+            "tokens": tokens,
+            "tokens_per_sec": tokens / generation if generation > 0 else 0.0,
+        }
+        return "".join(parts), stat
+
+    def close(self):
+        self.client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ResponseCache:
+    """
+    基于 SQLite 的补全结果磁盘缓存
+    - 键为 model + 规范化后的 messages + 其余参数的 SHA-256
+    - 总大小超过 max_bytes 时按最近访问时间 (LRU) 淘汰
+    - ttl 秒后条目过期（None 表示永不过期）
+    - 流式请求不缓存
+    """
+
+    def __init__(self, path="chat_cache.sqlite", max_bytes=256 * 1024 * 1024, ttl=None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        # WAL + NORMAL 同步：写入无需每次 fsync，命中时更新访问时间的开销很小
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)")
+        self.size = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+
+    @staticmethod
+    def normalize_message(message):
+        if not isinstance(message, dict):
+            message = message.model_dump(exclude_none=True)
+        message = {k: v for k, v in message.items() if v is not None}
+        if isinstance(message.get("content"), str):
+            message["content"] = message["content"].strip()
+        return message
+
+    def make_key(self, model, messages, **params):
+        payload = {
+            "model": model,
+            "messages": [self.normalize_message(m) for m in messages],
+            "params": params,
+        }
+        data = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        row = self.db.execute("SELECT value, created FROM cache WHERE key = ?", (key,)).fetchone()
+        now = time.time()
+        if row is None or (self.ttl is not None and now - row[1] > self.ttl):
+            self.misses += 1
+            instrument.count("chat.cache_miss")
+            return None
+        self.db.execute("UPDATE cache SET accessed = ? WHERE key = ?", (now, key))
+        self.hits += 1
+        instrument.count("chat.cache_hit")
+        return ChatCompletion.model_validate_json(row[0])
+
+    def put(self, key, response):
+        value = response.model_dump_json()
+        now = time.time()
+        old = self.db.execute("SELECT size FROM cache WHERE key = ?", (key,)).fetchone()
+        self.db.execute(
+            "INSERT OR REPLACE INTO cache (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+            (key, value, len(value), now, now))
+        self.size += len(value) - (old[0] if old else 0)
+        if self.size > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        """删除过期条目，再按 LRU 淘汰到 max_bytes 的 90%"""
+        if self.ttl is not None:
+            self.db.execute("DELETE FROM cache WHERE created < ?", (time.time() - self.ttl,))
+        target = self.max_bytes * 0.9
+        size = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+        if size > target:
+            victims = []
+            for key, item_size in self.db.execute("SELECT key, size FROM cache ORDER BY accessed"):
+                if size <= target:
+                    break
+                victims.append((key,))
+                size -= item_size
+            self.db.executemany("DELETE FROM cache WHERE key = ?", victims)
+        self.size = size
+
+    def lookup(self, model, messages, **params):
+        """返回 (key, 缓存结果或 None)"""
+        key = self.make_key(model, messages, **params)
+        return key, self.get(key)
+
+    def wrap(self, client):
+        """替换 client.chat.completions.create，使同步/异步客户端透明地使用缓存"""
+        completions = client.chat.completions
+        create = completions.create
+
+        # SDK 用同步装饰器包裹了异步方法，需要先解包再判断
+        if inspect.iscoroutinefunction(inspect.unwrap(create)):
+            @functools.wraps(create)
+            async def cached_create(*, model, messages, **params):
+                if params.get("stream"):
+                    return await create(model=model, messages=messages, **params)
+                key, response = self.lookup(model, messages, **params)
+                if response is None:
+                    response = await create(model=model, messages=messages, **params)
+                    self.put(key, response)
+                return response
+        else:
+            @functools.wraps(create)
+            def cached_create(*, model, messages, **params):
+                if params.get("stream"):
+                    return create(model=model, messages=messages, **params)
+                key, response = self.lookup(model, messages, **params)
+                if response is None:
+                    response = create(model=model, messages=messages, **params)
+                    self.put(key, response)
+                return response
+
+        completions.create = cached_create
+        return client
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": self.db.execute("SELECT COUNT(*) FROM cache").fetchone()[0],
+            "bytes": self.size,
+        }
+
+    def close(self):
+        self.db.close()
+
+
+class TokenBucket:
+    """令牌桶限速器：平均每秒 rate 个请求，允许 capacity 个突发"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1, int(rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def read_prompts(path):
+    """
+    读取 JSONL 格式的提示词，每行为 {"id": ..., "prompt": "..."} 或 {"id": ..., "messages": [...]}
+    未提供 id 时使用行号
+    """
+    with open(path, encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            item = json.loads(line)
+            if "messages" not in item:
+                item["messages"] = [{"role": "user", "content": item.pop("prompt")}]
+            item.setdefault("id", lineno)
+            yield item
+
+
+def completed_ids(path):
+    """读取已有输出文件中成功完成的 id，用于断点续跑"""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # 上次中断时可能留下半行
+                continue
+            if "error" not in record:
+                done.add(record["id"])
+    return done
+
+
+def is_retryable(error):
+    if isinstance(error, APIConnectionError):
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return False
+
+
+async def complete_with_retry(client, limiter, item, model, max_retries, cache=None, **params):
+    """带指数退避重试的单次补全请求；缓存命中时不占用限速配额"""
+    if cache is not None:
+        key, response = cache.lookup(model, item["messages"], **params)
+        if response is not None:
+            return {
+                "id": item["id"],
+                "response": response.choices[0].message.content,
+                "usage": response.usage.model_dump() if response.usage else None,
+                "latency": 0.0,
+                "attempts": 0,
+                "cached": True,
+            }
+    for attempt in range(1, max_retries + 2):
+        await limiter.acquire()
+        start = time.perf_counter()
+        try:
+            response = await client.chat.completions.create(
+                model=model, messages=item["messages"], **params)
+        except Exception as e:
+            instrument.count("chat.request_error")
+            if attempt > max_retries or not is_retryable(e):
+                return {"id": item["id"], "error": f"{type(e).__name__}: {e}", "attempts": attempt}
+            await asyncio.sleep(min(30.0, 0.5 * 2 ** (attempt - 1)) * (0.5 + random.random()))
+            continue
+        latency = time.perf_counter() - start
+        instrument.record("chat.batch_request", latency, attempt=attempt)
+        record = {
+            "id": item["id"],
+            "response": response.choices[0].message.content,
+            "usage": response.usage.model_dump() if response.usage else None,
+            "latency": latency,
+            "attempts": attempt,
+        }
+        # 只缓存能正常解析的响应
+        if cache is not None:
+            cache.put(key, response)
+        return record
+
+
+async def run_batch(input_path, output_path, model=MODEL, api_key=API_KEY, base_url=BASE_URL,
+                    concurrency=16, rate=10.0, max_retries=5, timeout=60.0, cache=None, **params):
+    """
+    并发批量补全
+    - 最多 concurrency 个请求同时进行，令牌桶限制每秒请求数
+    - 结果按完成顺序逐行追加写入 output_path
+    - 再次运行时跳过输出文件中已成功的 id，失败的会重新请求
+    - 提供 cache (ResponseCache) 时相同请求直接返回缓存结果
+    返回:
+        dict: 成功数、失败数、跳过数、耗时和吞吐
+    """
+    done = completed_ids(output_path)
+    queue = asyncio.Queue(maxsize=concurrency * 2)
+    limiter = TokenBucket(rate)
+    stats = {"ok": 0, "failed": 0, "skipped": 0}
+    start = time.perf_counter()
+
+    client = AsyncOpenAI(api_key=api_key, base_url=base_url, timeout=timeout, max_retries=0)
+    with open(output_path, "a", encoding="utf-8") as out:
+        async def worker():
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                try:
+                    record = await complete_with_retry(client, limiter, item, model, max_retries,
+                                                       cache=cache, **params)
+                except Exception as e:
+                    # 响应格式异常等意外错误只记为该条失败，worker 继续处理后续任务
+                    record = {"id": item["id"], "error": f"{type(e).__name__}: {e}"}
+                stats["failed" if "error" in record else "ok"] += 1
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        try:
+            for item in read_prompts(input_path):
+                if item["id"] in done:
+                    stats["skipped"] += 1
+                    continue
+                await queue.put(item)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            # 出错或被取消时，在关闭输出文件之前停止所有 worker
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+    await client.close()
+
+    stats["elapsed"] = time.perf_counter() - start
+    stats["requests_per_sec"] = (stats["ok"] + stats["failed"]) / stats["elapsed"] if stats["elapsed"] else 0.0
+    return stats
+
+
+def chat_demo():
+    with ChatSession() as session:
+        # Round 1
+        print("Round 1: ", end="")
+        session.ask("What's the highest mountain in the world?")
+        print(f"Messages Round 1: {session.messages}")
+
+        # Round 2
+        print("Round 2: ", end="")
+        session.ask("What is the second?")
+        print(f"Messages Round 2: {session.messages}")
+
+        for i, stat in enumerate(session.stats, 1):
+            print(f"Round {i}: TTFT {stat['ttft'] * 1000:.0f}ms, "
+                  f"{stat['tokens']} tokens, {stat['tokens_per_sec']:.1f} tokens/sec, "
+                  f"总耗时 {stat['total']:.2f}s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="DeepSeek 对话客户端")
+    parser.add_argument("--batch", metavar="INPUT", help="批量处理 JSONL 提示词文件")
+    parser.add_argument("--output", default="results.jsonl", help="批量结果输出文件")
+    parser.add_argument("--concurrency", type=int, default=16, help="最大并发请求数")
+    parser.add_argument("--rate", type=float, default=10.0, help="每秒最多发起的请求数")
+    parser.add_argument("--retries", type=int, default=5, help="失败重试次数")
+    parser.add_argument("--cache", metavar="PATH", help="启用磁盘响应缓存（SQLite 文件路径）")
+    parser.add_argument("--cache-ttl", type=float, default=None, help="缓存过期时间（秒）")
+    args = parser.parse_args(argv)
+
+    if args.batch:
+        cache = ResponseCache(args.cache, ttl=args.cache_ttl) if args.cache else None
+        with instrument.profiled("chat.batch"):
+            stats = asyncio.run(run_batch(args.batch, args.output, concurrency=args.concurrency,
+                                          rate=args.rate, max_retries=args.retries, cache=cache))
+        print(f"完成 {stats['ok']}, 失败 {stats['failed']}, 跳过 {stats['skipped']}, "
+              f"用时 {stats['elapsed']:.2f}s, {stats['requests_per_sec']:.1f} req/s")
+        if cache is not None:
+            print(f"缓存: {cache.stats()}")
+            cache.close()
+    else:
+        chat_demo()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
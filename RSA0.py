@@ -6,15 +6,36 @@ RSA加密解密工具
 版本: 1.1 - 文件结构优化
 """
 
-from cryptography.hazmat.backends import default_backend  # 加密后端
-from cryptography.hazmat.primitives.asymmetric import rsa, padding  # RSA算法和填充模式
-from cryptography.hazmat.primitives import serialization, hashes  # 序列化和哈希算法
-from cryptography.hazmat.primitives.serialization import load_pem_private_key, load_pem_public_key  # 加载PEM格式密钥
+# cryptography 只在真正执行密钥生成/加密/解密时才导入，见 crypto_backend() 和 oaep_padding()
 import os  # 文件系统操作
-import base64  # Base64编码
 import re  # 正则表达式
+import sys
 import random
 import string
+import functools
+import instrument  # 计时埋点，设置 PYTOOLS_TRACE 后生效
+
+# 模块导入耗时预算（毫秒），由 --check-import-time 校验
+IMPORT_TIME_BUDGET_MS = 20
+
+
+@functools.lru_cache(maxsize=None)
+def crypto_backend():
+    """加密后端，首次使用时导入并创建，之后复用"""
+    from cryptography.hazmat.backends import default_backend
+    return default_backend()
+
+
+@functools.lru_cache(maxsize=None)
+def oaep_padding():
+    """OAEP-SHA256 填充对象，加密和解密共用同一个实例"""
+    from cryptography.hazmat.primitives.asymmetric import padding  # RSA填充模式
+    from cryptography.hazmat.primitives import hashes  # 哈希算法
+    return padding.OAEP(
+        mgf=padding.MGF1(algorithm=hashes.SHA256()),
+        algorithm=hashes.SHA256(),
+        label=None
+    )
 
 
 def validate_password(password):
@@ -56,11 +77,14 @@ def generate_rsa_keys(password, private_key_file="private.pem", public_key_file=
         bool: 生成成功返回True，失败返回False
     """
     try:
+        from cryptography.hazmat.primitives.asymmetric import rsa  # RSA算法
+        from cryptography.hazmat.primitives import serialization  # 序列化
+
         password = validate_password(password)
         private_key = rsa.generate_private_key(
             public_exponent=65537,
             key_size=2048,
-            backend=default_backend()
+            backend=crypto_backend()
         )
         
         private_pem = private_key.private_bytes(
@@ -99,9 +123,11 @@ def load_private_key(password, private_key_file="private.pem"):
         return None
         
     try:
+        from cryptography.hazmat.primitives.serialization import load_pem_private_key  # 加载PEM格式私钥
+
         with open(f'RSAkey/{private_key_file}', 'rb') as f:
             private_pem = f.read()
-        return load_pem_private_key(private_pem, password.encode(), backend=default_backend())
+        return load_pem_private_key(private_pem, password.encode(), backend=crypto_backend())
     except ValueError:
         print("错误：密码不正确")
         return None
@@ -122,9 +148,11 @@ def load_public_key(public_key_file="public.pem"):
         return None
         
     try:
+        from cryptography.hazmat.primitives.serialization import load_pem_public_key  # 加载PEM格式公钥
+
         with open(f'RSAkey/{public_key_file}', 'rb') as f:
             public_pem = f.read()
-        return load_pem_public_key(public_pem, backend=default_backend())
+        return load_pem_public_key(public_pem, backend=crypto_backend())
     except Exception as e:
         print(f"加载公钥时出错: {e}")
         return None
@@ -142,14 +170,7 @@ def encrypt_with_public_key(public_key, plaintext):
         if not plaintext:
             raise ValueError("加密文本不能为空")
             
-        ciphertext = public_key.encrypt(
-            plaintext.encode(),
-            padding.OAEP(
-                mgf=padding.MGF1(algorithm=hashes.SHA256()),
-                algorithm=hashes.SHA256(),
-                label=None
-            )
-        )
+        ciphertext = public_key.encrypt(plaintext.encode(), oaep_padding())
         return ciphertext
     except Exception as e:
         print(f"加密时出错: {e}")
@@ -165,14 +186,7 @@ def decrypt_with_private_key(private_key, ciphertext):
         str: 解密后的明文，失败返回None
     """
     try:
-        plaintext = private_key.decrypt(
-            ciphertext,
-            padding.OAEP(
-                mgf=padding.MGF1(algorithm=hashes.SHA256()),
-                algorithm=hashes.SHA256(),
-                label=None
-            )
-        )
+        plaintext = private_key.decrypt(ciphertext, oaep_padding())
         return plaintext.decode()
     except Exception as e:
         print(f"解密时出错: {e}")
@@ -365,7 +379,9 @@ def main():
         # 检查并生成密钥对
         if not (os.path.exists("RSAkey/private.pem") and os.path.exists("RSAkey/public.pem")):
             password = input("首次使用需要设置密码: ").strip()
-            if not generate_rsa_keys(password):
+            with instrument.span("rsa.keygen"):
+                ok = generate_rsa_keys(password)
+            if not ok:
                 print("初始化失败，程序退出")
                 return
             print("初始化完成")
@@ -383,9 +399,11 @@ def main():
                 choice = input("请选择操作 [1-3]: ").strip()
                 
                 if choice == "1":
-                    encryption()
+                    with instrument.span("rsa.encryption"):
+                        encryption()
                 elif choice == "2":
-                    decryption()
+                    with instrument.span("rsa.decryption"):
+                        decryption()
                 elif choice == "3":
                     graceful_exit()
                     break
@@ -425,5 +443,46 @@ def graceful_exit():
     print(" 完成")
     print("感谢使用RSA加密解密工具，再见！")
 
+def check_import_time(budget_ms=IMPORT_TIME_BUDGET_MS):
+    """
+    用 python -X importtime 在新进程中测量导入本模块的耗时
+    参数:
+        budget_ms (float): 允许的累计导入耗时（毫秒）
+    返回:
+        bool: 未超出预算且没有导入 cryptography 时返回True
+    """
+    import subprocess
+
+    module_dir = os.path.dirname(os.path.abspath(__file__))
+    module_name = os.path.splitext(os.path.basename(__file__))[0]
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module_name}'],
+        cwd=module_dir, capture_output=True, text=True
+    )
+    total_us = None
+    crypto_loaded = False
+    # 每行格式: "import time: self [us] | cumulative | imported package"
+    for line in result.stderr.splitlines():
+        parts = line.split('|')
+        if len(parts) != 3:
+            continue
+        name = parts[2].strip()
+        if name.startswith('cryptography'):
+            crypto_loaded = True
+        if name == module_name:
+            total_us = int(parts[1])
+    if result.returncode != 0 or total_us is None:
+        print(f"导入失败:\n{result.stderr}")
+        return False
+
+    total_ms = total_us / 1000
+    print(f"导入 {module_name} 耗时 {total_ms:.1f}ms（预算 {budget_ms}ms）")
+    if crypto_loaded:
+        print("错误：导入时加载了 cryptography")
+    return total_ms <= budget_ms and not crypto_loaded
+
 if __name__ == "__main__":
-    main()
+    if sys.argv[1:] == ["--check-import-time"]:
+        sys.exit(0 if check_import_time() else 1)
+    with instrument.profiled("rsa0"):
+        main()
@@ -3,83 +3,379 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.edge.service import Service
+from selenium.common.exceptions import WebDriverException, JavascriptException
 from webdriver_manager.microsoft import EdgeChromiumDriverManager
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import argparse
+import functools
+import queue
+import csv
 import time
 import os
 import sys
 import platform
 
+LOGIN_URL = "http://example.com/login"
+
+
+@functools.lru_cache(maxsize=None)
+def resolve_driver_path():
+    """解析 Edge 驱动路径，整个进程只执行一次；失败时返回 None 交给 Selenium 自行查找"""
+    # 使用webdriver_manager自动下载和管理驱动
+    os.environ['WDM_LOCAL'] = '1'  # 启用本地缓存
+    os.environ['WDM_LOG_LEVEL'] = '0'  # 详细日志输出
+    cache_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "webdriver_cache")
+    os.makedirs(cache_path, exist_ok=True)
+
+    print(f"缓存路径: {cache_path}")
+    print("尝试安装Edge驱动...")
+
+    try:
+        driver_path = EdgeChromiumDriverManager(path=cache_path).install()
+        print(f"驱动路径: {driver_path}")
+        return driver_path
+    except Exception as driver_error:
+        print(f"驱动管理器错误: {driver_error}")
+        print("尝试使用备选方法初始化...")
+        return None
+
+
+def make_options(headless=True):
+    # 设置Edge选项
+    edge_options = webdriver.EdgeOptions()
+    # 添加一些可能解决问题的选项
+    edge_options.add_argument("--no-sandbox")
+    edge_options.add_argument("--disable-dev-shm-usage")
+    if headless:
+        edge_options.add_argument("--headless=new")
+    return edge_options
+
+
+class DriverPool:
+    """
+    Edge 浏览器实例池
+    - 驱动只解析一次，浏览器预先启动并在多次登录之间复用
+    - 每次归还前清空 cookie；只有浏览器本身失效时才销毁并补充新实例
+    - 启动失败的槽位以 None 放回，下一次 acquire 时重试启动，槽位不会丢失
+    """
+
+    def __init__(self, size=1, headless=True, acquire_timeout=300):
+        self.size = size
+        self.headless = headless
+        self.acquire_timeout = acquire_timeout
+        self.driver_path = resolve_driver_path()
+        self.idle = queue.Queue()
+        self.drivers = []
+        # 并行预热所有浏览器实例
+        with ThreadPoolExecutor(max_workers=size) as executor:
+            for driver in executor.map(lambda _: self.try_new_driver(), range(size)):
+                self.idle.put(driver)
+
+    def new_driver(self):
+        # 如果自动安装失败，不指定路径，交给 Selenium 查找驱动
+        service = Service(self.driver_path) if self.driver_path else Service()
+        driver = webdriver.Edge(service=service, options=make_options(self.headless))
+        self.drivers.append(driver)
+        return driver
+
+    def try_new_driver(self):
+        """启动浏览器，失败时返回 None（空槽位）"""
+        try:
+            return self.new_driver()
+        except Exception as e:
+            print(f"浏览器启动失败: {e}")
+            return None
+
+    def discard(self, driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        if driver in self.drivers:
+            self.drivers.remove(driver)
+
+    @staticmethod
+    def is_alive(driver):
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+
+    @contextmanager
+    def acquire(self):
+        try:
+            driver = self.idle.get(timeout=self.acquire_timeout)
+        except queue.Empty:
+            raise TimeoutError(f"{self.acquire_timeout} 秒内没有可用的浏览器实例")
+        try:
+            if driver is None:
+                driver = self.new_driver()
+            yield driver
+        except WebDriverException:
+            # 超时、找不到元素等页面错误不影响浏览器本身，只有实例失效时才重建
+            if driver is not None and not self.is_alive(driver):
+                self.discard(driver)
+                driver = self.try_new_driver()
+            raise
+        finally:
+            # 无论成功与否都归还槽位，避免其他 worker 永久等待
+            if driver is not None:
+                try:
+                    driver.delete_all_cookies()
+                except Exception:
+                    self.discard(driver)
+                    driver = self.try_new_driver()
+            self.idle.put(driver)
+
+    def close(self):
+        for driver in list(self.drivers):
+            self.discard(driver)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class StepTimer:
+    """记录每个步骤的耗时（秒），用于定位登录各阶段的时间开销"""
+
+    def __init__(self):
+        self.steps = {}
+
+    @contextmanager
+    def step(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps[name] = self.steps.get(name, 0.0) + time.perf_counter() - start
+
+    def report(self):
+        return ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in self.steps.items())
+
+
+def wait_for_element(driver, locator, timeout=10, clickable=False):
+    """等待元素出现（或可点击）后立即返回该元素"""
+    condition = EC.element_to_be_clickable if clickable else EC.presence_of_element_located
+    return WebDriverWait(driver, timeout).until(condition(locator))
+
+
+def wait_for_url_change(driver, old_url, timeout=10):
+    """等待页面地址离开 old_url"""
+    return WebDriverWait(driver, timeout).until(EC.url_changes(old_url))
+
+
+# 点击登录前注入页面：统计进行中的 fetch / XHR 请求，记录 DOM 结构变化和开始跳转
+TRACK_REQUESTS_JS = """
+if (!window.__loginTracker) {
+    var t = window.__loginTracker = {pending: 0, changed: false, navigating: false};
+    var done = function () { t.pending--; };
+    if (window.fetch) {
+        var fetch = window.fetch;
+        window.fetch = function () {
+            t.pending++;
+            try {
+                var p = fetch.apply(this, arguments);
+            } catch (e) {
+                done();
+                throw e;
+            }
+            p.then(done, done);
+            return p;
+        };
+    }
+    var send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        t.pending++;
+        this.addEventListener('loadend', done);
+        try {
+            return send.apply(this, arguments);
+        } catch (e) {
+            this.removeEventListener('loadend', done);
+            done();
+            throw e;
+        }
+    };
+    new MutationObserver(function () { t.changed = true; })
+        .observe(document.documentElement, {childList: true, subtree: true});
+    window.addEventListener('beforeunload', function () { t.navigating = true; });
+}
+window.__loginTracker.changed = false;
+window.__loginTracker.navigating = false;
+"""
+
+# 页面状态: readyState、已加载资源数、进行中的请求数，以及相对注入时的变化
+# （"new" 表示已经是新文档，"navigating" 表示旧文档正在跳转，"changed" 表示 DOM 已变化）
+PAGE_STATE_JS = """
+var t = window.__loginTracker;
+var change = !t ? "new" : t.navigating ? "navigating" : t.changed ? "changed" : "same";
+return [document.readyState, performance.getEntriesByType('resource').length,
+        t ? t.pending : 0, change];
+"""
+
+
+def track_requests(driver):
+    """在当前页面注入请求跟踪，之后的网络空闲判断会等待进行中的 fetch / XHR 完成"""
+    driver.execute_script(TRACK_REQUESTS_JS)
+
+
+def network_idle_condition(idle_time=0.5, require_change=False):
+    """
+    网络空闲判断条件：
+    document.readyState 为 complete、没有进行中的 fetch / XHR（需先调用 track_requests）、
+    旧文档没有正在跳转，并且已加载的资源数在 idle_time 秒内不再变化
+    require_change 为 True 时还要求页面相对注入时已有变化（跳转到新文档或 DOM 结构变化），
+    避免在服务器处理提交期间旧页面看似空闲而提前返回
+    """
+    state = {"count": -1, "since": time.monotonic()}
+
+    def idle(d):
+        ready, count, pending, change = d.execute_script(PAGE_STATE_JS)
+        now = time.monotonic()
+        if (ready != "complete" or pending or change == "navigating"
+                or (require_change and change == "same") or count != state["count"]):
+            state["count"] = count
+            state["since"] = now
+            return False
+        return now - state["since"] >= idle_time
+
+    return idle
+
+
+def wait_for_network_idle(driver, timeout=10, idle_time=0.5, poll=0.1, require_change=False):
+    """等待页面加载完成且网络空闲"""
+    return WebDriverWait(driver, timeout, poll_frequency=poll, ignored_exceptions=[JavascriptException]).until(
+        network_idle_condition(idle_time, require_change))
+
+
+def wait_for_login_done(driver, old_url, timeout=10, idle_time=0.5, poll=0.1):
+    """
+    等待登录完成：页面地址离开 old_url，或页面发生变化后网络空闲（适用于不跳转的单页应用）
+    两个条件在同一个等待中轮询，哪个先满足就立即返回；点击前需调用 track_requests
+    """
+    url_changed = EC.url_changes(old_url)
+    idle = network_idle_condition(idle_time, require_change=True)
+    return WebDriverWait(driver, timeout, poll_frequency=poll, ignored_exceptions=[JavascriptException]).until(
+        lambda d: url_changed(d) or idle(d))
+
+
+def login(driver, username, password, url=LOGIN_URL, timeout=10, wait_for="any", timer=None):
+    """
+    在给定浏览器中完成一次登录操作
+    参数:
+        timeout (float): 每个等待条件的超时秒数
+        wait_for (str): 点击登录后的完成条件，"url" 等待地址变化，"idle" 等待网络空闲，
+            "any"（默认）两者任一满足即返回
+        timer (StepTimer): 可选，记录各步骤耗时
+    """
+    timer = timer or StepTimer()
+
+    # 打开网页 (这里使用示例URL，需要替换为实际URL)
+    with timer.step("打开页面"):
+        driver.get(url)
+
+    # 只等到用户名输入框出现，而不是固定等待
+    with timer.step("等待表单"):
+        username_input = wait_for_element(driver, (By.ID, "user"), timeout)
+        password_input = wait_for_element(driver, (By.ID, "password"), timeout)
+
+    with timer.step("填写表单"):
+        username_input.clear()
+        username_input.send_keys(username)
+
+        # 确保密码框可编辑
+        driver.execute_script("arguments[0].removeAttribute('readonly');", password_input)
+
+        # 清空并输入密码
+        password_input.clear()
+        password_input.send_keys(password)
+
+    # 找到登录按钮并点击
+    # 方法1：通过按钮文本内容查找
+    with timer.step("点击登录"):
+        login_button = wait_for_element(
+            driver, (By.XPATH, "//button[contains(text(), '登录')]"), timeout, clickable=True)
+        old_url = driver.current_url
+        if wait_for != "url":
+            track_requests(driver)
+        login_button.click()
+
+    # 等待登录过程完成
+    with timer.step("等待登录完成"):
+        if wait_for == "idle":
+            wait_for_network_idle(driver, timeout, require_change=True)
+        elif wait_for == "url":
+            wait_for_url_change(driver, old_url, timeout)
+        else:
+            wait_for_login_done(driver, old_url, timeout)
+    return timer
+
+
+def read_credentials(path):
+    """读取账号文件（CSV，每行: 用户名,密码[,登录地址]）"""
+    jobs = []
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        for row in reader:
+            if not row or row[0].startswith('#'):
+                continue
+            if len(row) < 2:
+                # 格式错误的行只跳过，不影响其他账号
+                print(f"警告: {path} 第 {reader.line_num} 行缺少密码列，已跳过", file=sys.stderr)
+                continue
+            username, password = row[0].strip(), row[1].strip()
+            url = row[2].strip() if len(row) > 2 and row[2].strip() else LOGIN_URL
+            jobs.append((username, password, url))
+    return jobs
+
+
+def run_logins(jobs, workers=4, headless=True, timeout=10, wait_for="any"):
+    """
+    用 workers 个常驻浏览器并发执行登录任务
+    返回:
+        list[dict]: 每个任务的用户名、是否成功、总耗时、各步骤耗时和错误信息
+    """
+    def run_job(pool, job):
+        username, password, url = job
+        timer = StepTimer()
+        start = time.perf_counter()
+        try:
+            with pool.acquire() as driver:
+                login(driver, username, password, url, timeout, wait_for, timer)
+            return {"user": username, "ok": True, "elapsed": time.perf_counter() - start,
+                    "steps": timer.steps}
+        except Exception as e:
+            return {"user": username, "ok": False, "elapsed": time.perf_counter() - start,
+                    "steps": timer.steps, "error": f"{type(e).__name__}: {e}"}
+
+    with DriverPool(size=min(workers, len(jobs)) or 1, headless=headless) as pool:
+        with ThreadPoolExecutor(max_workers=pool.size) as executor:
+            return list(executor.map(lambda job: run_job(pool, job), jobs))
+
+
 def auto_login():
     try:
         # 打印诊断信息
         print(f"Python 版本: {sys.version}")
         print(f"操作系统: {platform.system()} {platform.version()}")
         print(f"Selenium 版本: {webdriver.__version__}")
-        
-        # 设置Edge选项
-        edge_options = webdriver.EdgeOptions()
-        # 添加一些可能解决问题的选项
-        edge_options.add_argument("--no-sandbox")
-        edge_options.add_argument("--disable-dev-shm-usage")
-        
+
         print("正在设置Edge驱动...")
-        
-        # 使用webdriver_manager自动下载和管理驱动
-        os.environ['WDM_LOCAL'] = '1'  # 启用本地缓存
-        os.environ['WDM_LOG_LEVEL'] = '0'  # 详细日志输出
-        cache_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "webdriver_cache")
-        os.makedirs(cache_path, exist_ok=True)
-        
-        print(f"缓存路径: {cache_path}")
-        print("尝试安装Edge驱动...")
-        
-        try:
-            driver_path = EdgeChromiumDriverManager(path=cache_path).install()
-            print(f"驱动路径: {driver_path}")
-            service = Service(driver_path)
-        except Exception as driver_error:
-            print(f"驱动管理器错误: {driver_error}")
-            print("尝试使用备选方法初始化...")
-            # 如果自动安装失败，尝试不使用webdriver_manager
-            service = Service()
-            
+
         # 初始化Edge浏览器
         print("正在初始化Edge浏览器...")
-        driver = webdriver.Edge(service=service, options=edge_options)
-        
-        print("Edge驱动设置成功，开始自动化操作...")
-        
-        # 打开网页 (这里使用示例URL，需要替换为实际URL)
-        driver.get("http://example.com/login")
-        
-        # 等待页面加载完成
-        time.sleep(2)
-        
-        # 找到用户名输入框并输入"a"
-        username_input = driver.find_element(By.ID, "user")
-        username_input.clear()
-        username_input.send_keys("a")
-        
-        # 找到密码输入框
-        password_input = driver.find_element(By.ID, "password")
-        
-        # 确保密码框可编辑
-        driver.execute_script("arguments[0].removeAttribute('readonly');", password_input)
-        
-        # 清空并输入密码
-        password_input.clear()
-        password_input.send_keys("psd")
-        
-        # 找到登录按钮并点击
-        # 方法1：通过按钮文本内容查找
-        login_button = driver.find_element(By.XPATH, "//button[contains(text(), '登录')]")
-        login_button.click()
-        
-        # 等待登录过程完成
-        time.sleep(3)
-        
+        with DriverPool(size=1, headless=False) as pool:
+            print("Edge驱动设置成功，开始自动化操作...")
+            with pool.acquire() as driver:
+                timer = login(driver, "a", "psd")
+
         print("登录操作完成")
-        
+        print(f"各步骤耗时: {timer.report()}")
+
     except Exception as e:
         print(f"发生错误: {e}")
         print(f"错误类型: {type(e).__name__}")
@@ -94,16 +390,39 @@ def auto_login():
         print("     service = Service('msedgedriver.exe')")
         print("     driver = webdriver.Edge(service=service, options=edge_options)")
         print("5. 尝试使用Firefox作为替代方案")
-    
-    finally:
-        # 关闭浏览器
-        if 'driver' in locals():
-            driver.quit()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Edge 自动登录")
+    parser.add_argument("--credentials", metavar="CSV", help="账号文件，每行: 用户名,密码[,登录地址]")
+    parser.add_argument("--workers", type=int, default=4, help="并发浏览器数量")
+    parser.add_argument("--show", action="store_true", help="显示浏览器窗口（默认无头模式）")
+    parser.add_argument("--timeout", type=float, default=10, help="每个等待条件的超时秒数")
+    parser.add_argument("--wait-for", choices=["any", "url", "idle"], default="any",
+                        help="登录完成条件: any=地址变化或网络空闲（先满足者）, url=地址变化, idle=网络空闲")
+    args = parser.parse_args(argv)
+
+    if not args.credentials:
+        auto_login()
+        return
+
+    jobs = read_credentials(args.credentials)
+    start = time.perf_counter()
+    results = run_logins(jobs, workers=args.workers, headless=not args.show,
+                         timeout=args.timeout, wait_for=args.wait_for)
+    total = time.perf_counter() - start
+    for r in results:
+        status = "成功" if r["ok"] else f"失败 ({r['error']})"
+        steps = ", ".join(f"{name} {sec * 1000:.0f}ms" for name, sec in r["steps"].items())
+        print(f"{r['user']}: {status}, 用时 {r['elapsed']:.2f}s ({steps})")
+    ok = sum(r["ok"] for r in results)
+    print(f"共 {len(results)} 个任务, 成功 {ok}, 总用时 {total:.2f}s")
+
 
 if __name__ == "__main__":
     # 安装依赖提示
     print("请确保已安装所需依赖:")
     print("pip install selenium webdriver-manager")
     print("\n开始执行自动化脚本...")
-    
-    auto_login()
+
+    main(sys.argv[1:])
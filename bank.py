@@ -4,17 +4,288 @@ import subprocess
 import sys
 import re
 import os
-from threading import Thread
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, Future
 import json
 from pathlib import Path
+import instrument  # 计时埋点，设置 PYTOOLS_TRACE 后生效
 
 current_env = {"type": "system", "path": sys.executable, "name": "系统 Python"}
 all_environments = []
 
+class CommandExecutor:
+    """
+    统一的子进程执行层
+    - 有界线程池，限制同时运行的 pip / python 进程数
+    - 只读查询使用独立的线程池，不会排在耗时的安装之后
+    - 同一环境内会修改环境的操作（安装/更新/卸载）串行执行；排队的操作不占用工作线程
+    - 相同的只读查询在进行中时复用同一个 Future，不重复启动进程；环境被修改后不再复用修改前发起的查询
+    - 只读查询带超时；修改环境的命令默认不限时，避免大包下载或源码构建被中途杀掉而装坏环境
+    - 记录每条命令的运行耗时
+    """
+
+    def __init__(self, max_workers=4, query_workers=2, timeout=300, mutating_timeout=None):
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="cmd")
+        self.query_pool = ThreadPoolExecutor(max_workers=query_workers, thread_name_prefix="query")
+        self.timeout = timeout
+        self.mutating_timeout = mutating_timeout
+        self.lock = threading.Lock()
+        self.env_queues = {}  # 环境 -> 等待执行的 (Future, fn)；存在该键表示环境正忙
+        self.in_flight = {}
+        self.history = deque(maxlen=200)
+
+    def submit_serial(self, env_path, fn):
+        """
+        提交修改 env_path 的操作，同一环境内按提交顺序逐个执行
+        前一个操作完成后才把下一个提交到线程池，等待期间不占用工作线程
+        """
+        future = Future()
+        with self.lock:
+            pending = self.env_queues.get(env_path)
+            if pending is not None:
+                pending.append((future, fn))
+                return future
+            self.env_queues[env_path] = deque()
+        self.start_serial(env_path, future, fn)
+        return future
+
+    def start_serial(self, env_path, future, fn):
+        def run():
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        result = fn()
+                    except BaseException as e:
+                        self.forget_queries(env_path)
+                        future.set_exception(e)
+                    else:
+                        # 先作废旧查询再通知完成，完成回调中发起的刷新不会拿到修改前的结果
+                        self.forget_queries(env_path)
+                        future.set_result(result)
+            finally:
+                self.next_serial(env_path)
+        self.pool.submit(run)
+
+    def next_serial(self, env_path):
+        with self.lock:
+            pending = self.env_queues[env_path]
+            if not pending:
+                del self.env_queues[env_path]
+                return
+            future, fn = pending.popleft()
+        self.start_serial(env_path, future, fn)
+
+    def forget_queries(self, env_path):
+        """环境被修改后，进行中的只读查询结果已过时，之后相同的查询重新启动进程"""
+        with self.lock:
+            for key in [key for key in self.in_flight if key[0] == env_path]:
+                del self.in_flight[key]
+
+    def execute(self, cmd, timeout, merge_stderr):
+        start = time.perf_counter()
+        returncode = None
+        instrument.count("bank.commands")
+        try:
+            result = subprocess.run(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT if merge_stderr else subprocess.PIPE,
+                text=True,
+                timeout=timeout,
+            )
+            returncode = result.returncode
+            if result.returncode != 0:
+                raise subprocess.CalledProcessError(result.returncode, cmd,
+                                                    output=result.stdout, stderr=result.stderr)
+            return result.stdout
+        finally:
+            elapsed = time.perf_counter() - start
+            self.history.append({"cmd": cmd, "elapsed": elapsed, "returncode": returncode})
+            instrument.record("bank.command", elapsed, cmd=cmd, returncode=returncode)
+
+    def submit(self, cmd, mutating=False, env_path=None, timeout=None, merge_stderr=False):
+        """
+        提交命令，返回 Future，结果为命令的标准输出
+        参数:
+            mutating (bool): 是否会修改环境；为 True 时按 env_path 串行执行
+            env_path (str): 所属环境的 Python 路径，默认取命令的第一个参数；
+                只读查询按环境归类，该环境的修改操作完成后不再复用进行中的查询
+            timeout (float): 超时秒数；默认只读查询为 self.timeout，修改操作为 self.mutating_timeout（None 表示不限时）
+        失败时 Future 抛出 CalledProcessError 或 TimeoutExpired
+        """
+        if timeout is None:
+            timeout = self.mutating_timeout if mutating else self.timeout
+        env_path = env_path or cmd[0]
+        if mutating:
+            return self.submit_serial(env_path, lambda: self.execute(cmd, timeout, merge_stderr))
+
+        key = (env_path, tuple(cmd), merge_stderr)
+        with self.lock:
+            future = self.in_flight.get(key)
+            if future is not None:
+                return future
+            future = self.query_pool.submit(self.execute, cmd, timeout, merge_stderr)
+            self.in_flight[key] = future
+
+        def forget(f):
+            with self.lock:
+                if self.in_flight.get(key) is f:
+                    del self.in_flight[key]
+        future.add_done_callback(forget)
+        return future
+
+    def submit_task(self, fn, env_path):
+        """提交由多条命令组成的修改操作，与 env_path 的其他修改操作串行执行 fn()"""
+        return self.submit_serial(env_path, fn)
+
+    def run(self, cmd, **kwargs):
+        """同步执行命令并返回标准输出"""
+        return self.submit(cmd, **kwargs).result()
+
+    def timings(self):
+        return list(self.history)
+
+executor = CommandExecutor()
+
+def when_done(future, on_success, on_error, interval=100):
+    """在 Tk 主线程中轮询 Future，完成后调用回调（避免在工作线程中操作界面）"""
+    if not future.done():
+        root.after(interval, when_done, future, on_success, on_error, interval)
+        return
+    try:
+        result = future.result()
+    except Exception as e:
+        on_error(e)
+    else:
+        on_success(result)
+
+class Wheelhouse:
+    """
+    多个环境共享的本地 wheel 缓存
+    - 先尝试 --no-index --find-links 离线安装，命中则完全不访问索引
+    - 未命中（或升级）时用目标环境的 pip wheel 下载/构建到缓存，再离线安装
+    - 安装时用到的 wheel 更新 mtime，总大小超过上限时按最久未使用淘汰
+    - 淘汰只在没有安装读取缓存目录时执行，否则推迟到最后一个安装结束
+    """
+
+    def __init__(self, path=None, max_bytes=2 * 1024 ** 3):
+        self.path = path or os.path.join(os.path.expanduser("~"), ".pywheelhouse")
+        self.max_bytes = max_bytes
+        # 多个环境同时向缓存写入同一 wheel 时串行化下载
+        self.fetch_lock = threading.Lock()
+        # 正在使用缓存目录的安装数，以及是否有推迟的淘汰
+        self.lock = threading.Lock()
+        self.readers = 0
+        self.evict_pending = False
+        os.makedirs(self.path, exist_ok=True)
+
+    def offline_install_cmd(self, python_path, packages, upgrade=False):
+        cmd = [python_path, '-m', 'pip', 'install', '--no-index', '--find-links', self.path]
+        if upgrade:
+            cmd.append('--upgrade')
+        return cmd + list(packages)
+
+    @contextmanager
+    def in_use(self):
+        """登记一个正在读取缓存目录的安装；最后一个安装结束时执行推迟的淘汰"""
+        with self.lock:
+            self.readers += 1
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.readers -= 1
+                if self.readers == 0 and self.evict_pending:
+                    self.evict_pending = False
+                    self.evict_now()
+
+    def try_offline_install(self, python_path, packages):
+        """只用缓存中的 wheel 安装；缺少所需 wheel 时返回 None"""
+        try:
+            output = executor.execute(self.offline_install_cmd(python_path, packages),
+                                      executor.mutating_timeout, True)
+        except subprocess.CalledProcessError:
+            return None
+        self.touch(output)
+        return output
+
+    def install(self, python_path, packages, upgrade=False):
+        """在执行器的工作线程中调用，返回 pip 输出"""
+        with self.in_use():
+            if not upgrade:
+                output = self.try_offline_install(python_path, packages)
+                if output is not None:
+                    return output
+
+            with self.fetch_lock:
+                # 等锁期间其他环境可能已经把同样的 wheel 下载到缓存，先再试一次离线安装
+                if not upgrade:
+                    output = self.try_offline_install(python_path, packages)
+                    if output is not None:
+                        return output
+                executor.execute([python_path, '-m', 'pip', 'wheel', '--wheel-dir', self.path,
+                                  '--find-links', self.path] + list(packages),
+                                 executor.mutating_timeout, True)
+            output = executor.execute(self.offline_install_cmd(python_path, packages, upgrade),
+                                      executor.mutating_timeout, True)
+            self.touch(output)
+            self.evict()  # 本次安装结束后才会真正执行
+            return output
+
+    def touch(self, pip_output):
+        """根据 pip 输出中的 "Processing .../xxx.whl" 行标记被使用的 wheel"""
+        for name in re.findall(r'([^\s/\\]+\.whl)', pip_output):
+            path = os.path.join(self.path, name)
+            if os.path.exists(path):
+                os.utime(path)
+
+    def wheels(self):
+        return [entry for entry in os.scandir(self.path) if entry.name.endswith('.whl')]
+
+    def size(self):
+        return sum(entry.stat().st_size for entry in self.wheels())
+
+    def evict(self):
+        """
+        淘汰超出上限的 wheel；返回删除的文件数
+        有安装正在进行时不删除文件，推迟到安装全部结束后执行并返回 None
+        """
+        with self.lock:
+            if self.readers:
+                self.evict_pending = True
+                return None
+            return self.evict_now()
+
+    def evict_now(self):
+        """删除最久未使用的 wheel，直到总大小不超过上限；调用方需持有 self.lock"""
+        max_bytes = self.max_bytes
+        entries = sorted(self.wheels(), key=lambda e: e.stat().st_mtime)
+        total = sum(e.stat().st_size for e in entries)
+        removed = 0
+        for entry in entries:
+            if total <= max_bytes:
+                break
+            total -= entry.stat().st_size
+            os.remove(entry.path)
+            removed += 1
+        return removed
+
+wheelhouse = Wheelhouse()
+
+def pip_install_future(python_path, packages, upgrade=False):
+    """按当前安装模式提交安装任务，返回 Future"""
+    if use_wheelhouse.get():
+        return executor.submit_task(lambda: wheelhouse.install(python_path, packages, upgrade), python_path)
+    cmd = [python_path, '-m', 'pip', 'install'] + (['--upgrade'] if upgrade else []) + list(packages)
+    return executor.submit(cmd, mutating=True, merge_stderr=True)
+
 def get_conda_environments():
     environments = []
     try:
-        result = subprocess.check_output(['conda', 'env', 'list', '--json'], text=True)
+        result = executor.run(['conda', 'env', 'list', '--json'], timeout=60)
         env_data = json.loads(result)
         
         for env_path in env_data.get('envs', []):
@@ -29,7 +300,7 @@ def get_conda_environments():
                     "name": f"Conda: {env_name}",
                     "path": python_path
                 })
-    except (subprocess.SubprocessError, json.JSONDecodeError, FileNotFoundError):
+    except (subprocess.SubprocessError, json.JSONDecodeError, OSError):
         pass
     
     return environments
@@ -62,6 +333,7 @@ def get_venv_environments():
     
     return environments
 
+@instrument.timed("bank.refresh_environments")
 def refresh_environments():
     global all_environments
     
@@ -90,19 +362,19 @@ def change_environment(event=None):
         status_bar.config(text=f"当前环境: {current_env['name']} | {current_env['path']}")
         refresh_packages()
 
+def parse_package_list(output):
+    """解析 pip list 的输出，返回 [(包名, 版本), ...]"""
+    packages = []
+    for line in output.split('\n')[2:]:
+        if line.strip():
+            parts = line.split()
+            if len(parts) >= 2:
+                packages.append((parts[0], parts[1]))
+    return packages
+
 def get_installed_packages():
-    try:
-        result = subprocess.check_output([current_env["path"], '-m', 'pip', 'list'], text=True)
-        packages = []
-        for line in result.split('\n')[2:]:
-            if line.strip():
-                parts = line.split()
-                if len(parts) >= 2:
-                    packages.append((parts[0], parts[1]))
-        return packages
-    except Exception as e:
-        messagebox.showerror("错误", f"无法获取已安装的包: {str(e)}")
-        return []
+    """在后台查询当前环境的已安装包，返回 Future"""
+    return executor.submit([current_env["path"], '-m', 'pip', 'list'], timeout=120)
 
 def install_package():
     package_name = simpledialog.askstring("安装包", "请输入要安装的包名:")
@@ -115,21 +387,17 @@ def install_package():
     progress_label = tk.Label(progress_window, text=f"正在 {current_env['name']} 中安装 {package_name}...")
     progress_label.pack(pady=20)
     
-    def run_install():
-        try:
-            result = subprocess.check_output(
-                [current_env["path"], '-m', 'pip', 'install', package_name],
-                stderr=subprocess.STDOUT,
-                text=True
-            )
-            progress_window.destroy()
-            messagebox.showinfo("成功", f"{package_name} 安装成功!")
-            refresh_packages()
-        except subprocess.CalledProcessError as e:
-            progress_window.destroy()
-            messagebox.showerror("错误", f"安装失败: {e.output}")
-    
-    Thread(target=run_install).start()
+    def on_success(output):
+        progress_window.destroy()
+        messagebox.showinfo("成功", f"{package_name} 安装成功!")
+        refresh_packages()
+
+    def on_error(e):
+        progress_window.destroy()
+        messagebox.showerror("错误", f"安装失败: {getattr(e, 'output', None) or e}")
+
+    future = pip_install_future(current_env["path"], package_name.split())
+    when_done(future, on_success, on_error)
 
 def update_package():
     selected = treeview.selection()
@@ -145,21 +413,17 @@ def update_package():
     progress_label = tk.Label(progress_window, text=f"正在 {current_env['name']} 中更新 {package_name}...")
     progress_label.pack(pady=20)
     
-    def run_update():
-        try:
-            result = subprocess.check_output(
-                [current_env["path"], '-m', 'pip', 'install', '--upgrade', package_name],
-                stderr=subprocess.STDOUT,
-                text=True
-            )
-            progress_window.destroy()
-            messagebox.showinfo("成功", f"{package_name} 更新成功!")
-            refresh_packages()
-        except subprocess.CalledProcessError as e:
-            progress_window.destroy()
-            messagebox.showerror("错误", f"更新失败: {e.output}")
-    
-    Thread(target=run_update).start()
+    def on_success(output):
+        progress_window.destroy()
+        messagebox.showinfo("成功", f"{package_name} 更新成功!")
+        refresh_packages()
+
+    def on_error(e):
+        progress_window.destroy()
+        messagebox.showerror("错误", f"更新失败: {getattr(e, 'output', None) or e}")
+
+    future = pip_install_future(current_env["path"], [package_name], upgrade=True)
+    when_done(future, on_success, on_error)
 
 def uninstall_package():
     selected = treeview.selection()
@@ -177,21 +441,18 @@ def uninstall_package():
     progress_label = tk.Label(progress_window, text=f"正在卸载 {package_name}...")
     progress_label.pack(pady=20)
     
-    def run_uninstall():
-        try:
-            result = subprocess.check_output(
-                [current_env["path"], '-m', 'pip', 'uninstall', '-y', package_name],
-                stderr=subprocess.STDOUT,
-                text=True
-            )
-            progress_window.destroy()
-            messagebox.showinfo("成功", f"{package_name} 卸载成功!")
-            refresh_packages()
-        except subprocess.CalledProcessError as e:
-            progress_window.destroy()
-            messagebox.showerror("错误", f"卸载失败: {e.output}")
-    
-    Thread(target=run_uninstall).start()
+    def on_success(output):
+        progress_window.destroy()
+        messagebox.showinfo("成功", f"{package_name} 卸载成功!")
+        refresh_packages()
+
+    def on_error(e):
+        progress_window.destroy()
+        messagebox.showerror("错误", f"卸载失败: {getattr(e, 'output', None) or e}")
+
+    future = executor.submit([current_env["path"], '-m', 'pip', 'uninstall', '-y', package_name],
+                             mutating=True, merge_stderr=True)
+    when_done(future, on_success, on_error)
 
 def search_packages():
     search_term = search_entry.get().lower()
@@ -202,12 +463,25 @@ def search_packages():
             treeview.insert('', 'end', values=package)
 
 def refresh_packages():
-    global all_packages
-    all_packages = get_installed_packages()
-    treeview.delete(*treeview.get_children())
-    
-    for package in all_packages:
-        treeview.insert('', 'end', values=package)
+    env_path = current_env["path"]
+    start = time.perf_counter()
+
+    def on_success(output):
+        global all_packages
+        # 查询期间切换了环境，丢弃旧环境的结果
+        if env_path != current_env["path"]:
+            return
+        all_packages = parse_package_list(output)
+        treeview.delete(*treeview.get_children())
+        for package in all_packages:
+            treeview.insert('', 'end', values=package)
+        instrument.record("bank.refresh_packages", time.perf_counter() - start, packages=len(all_packages))
+
+    def on_error(e):
+        if env_path == current_env["path"]:
+            messagebox.showerror("错误", f"无法获取已安装的包: {str(e)}")
+
+    when_done(get_installed_packages(), on_success, on_error)
 
 def show_package_details():
     selected = treeview.selection()
@@ -215,13 +489,8 @@ def show_package_details():
         return
     
     package_name = treeview.item(selected[0])['values'][0]
-    
-    try:
-        result = subprocess.check_output(
-            [current_env["path"], '-m', 'pip', 'show', package_name],
-            text=True
-        )
-        
+
+    def on_success(result):
         detail_window = tk.Toplevel(root)
         detail_window.title(f"{package_name} 详情")
         detail_window.geometry("500x400")
@@ -230,49 +499,132 @@ def show_package_details():
         text_area.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         text_area.insert(tk.END, result)
         text_area.config(state=tk.DISABLED)
-        
-    except subprocess.CalledProcessError as e:
+
+    def on_error(e):
         messagebox.showerror("错误", f"无法获取包详情: {str(e)}")
 
+    future = executor.submit([current_env["path"], '-m', 'pip', 'show', package_name], timeout=60)
+    when_done(future, on_success, on_error)
+
 def show_env_info():
-    try:
-        version_cmd = f'"{current_env["path"]}" --version'
-        version_result = subprocess.check_output(version_cmd, shell=True, text=True).strip()
-        
-        pip_version_cmd = f'"{current_env["path"]}" -m pip --version'
-        pip_version_result = subprocess.check_output(pip_version_cmd, shell=True, text=True).strip()
-        
-        package_count = len(all_packages)
-        
-        info_window = tk.Toplevel(root)
-        info_window.title(f"环境信息: {current_env['name']}")
-        info_window.geometry("500x300")
-        
-        info_frame = tk.Frame(info_window, padx=20, pady=20)
-        info_frame.pack(fill=tk.BOTH, expand=True)
-        
-        tk.Label(info_frame, text="环境名称:", font=("Arial", 10, "bold")).grid(row=0, column=0, sticky="w", pady=5)
-        tk.Label(info_frame, text=current_env['name']).grid(row=0, column=1, sticky="w", pady=5)
-        
-        tk.Label(info_frame, text="环境类型:", font=("Arial", 10, "bold")).grid(row=1, column=0, sticky="w", pady=5)
-        tk.Label(info_frame, text=current_env['type']).grid(row=1, column=1, sticky="w", pady=5)
-        
-        tk.Label(info_frame, text="Python路径:", font=("Arial", 10, "bold")).grid(row=2, column=0, sticky="w", pady=5)
-        path_label = tk.Label(info_frame, text=current_env['path'])
-        path_label.grid(row=2, column=1, sticky="w", pady=5)
-        
-        tk.Label(info_frame, text="Python版本:", font=("Arial", 10, "bold")).grid(row=3, column=0, sticky="w", pady=5)
-        tk.Label(info_frame, text=version_result).grid(row=3, column=1, sticky="w", pady=5)
-        
-        tk.Label(info_frame, text="Pip版本:", font=("Arial", 10, "bold")).grid(row=4, column=0, sticky="w", pady=5)
-        tk.Label(info_frame, text=pip_version_result).grid(row=4, column=1, sticky="w", pady=5)
-        
-        tk.Label(info_frame, text="已安装包数量:", font=("Arial", 10, "bold")).grid(row=5, column=0, sticky="w", pady=5)
-        tk.Label(info_frame, text=str(package_count)).grid(row=5, column=1, sticky="w", pady=5)
-        
-    except Exception as e:
+    env = current_env
+    # 两个查询并行执行，都完成后再显示窗口
+    version_future = executor.submit([env["path"], '--version'], timeout=30, merge_stderr=True)
+    pip_version_future = executor.submit([env["path"], '-m', 'pip', '--version'], timeout=60)
+
+    def on_error(e):
         messagebox.showerror("错误", f"无法获取环境信息: {str(e)}")
 
+    when_done(version_future,
+              lambda version: when_done(pip_version_future,
+                                        lambda pip_version: show_env_window(env, version.strip(), pip_version.strip()),
+                                        on_error),
+              on_error)
+
+def show_env_window(env, version_result, pip_version_result):
+    package_count = len(all_packages)
+    
+    info_window = tk.Toplevel(root)
+    info_window.title(f"环境信息: {env['name']}")
+    info_window.geometry("500x300")
+    
+    info_frame = tk.Frame(info_window, padx=20, pady=20)
+    info_frame.pack(fill=tk.BOTH, expand=True)
+    
+    tk.Label(info_frame, text="环境名称:", font=("Arial", 10, "bold")).grid(row=0, column=0, sticky="w", pady=5)
+    tk.Label(info_frame, text=env['name']).grid(row=0, column=1, sticky="w", pady=5)
+    
+    tk.Label(info_frame, text="环境类型:", font=("Arial", 10, "bold")).grid(row=1, column=0, sticky="w", pady=5)
+    tk.Label(info_frame, text=env['type']).grid(row=1, column=1, sticky="w", pady=5)
+    
+    tk.Label(info_frame, text="Python路径:", font=("Arial", 10, "bold")).grid(row=2, column=0, sticky="w", pady=5)
+    path_label = tk.Label(info_frame, text=env['path'])
+    path_label.grid(row=2, column=1, sticky="w", pady=5)
+    
+    tk.Label(info_frame, text="Python版本:", font=("Arial", 10, "bold")).grid(row=3, column=0, sticky="w", pady=5)
+    tk.Label(info_frame, text=version_result).grid(row=3, column=1, sticky="w", pady=5)
+    
+    tk.Label(info_frame, text="Pip版本:", font=("Arial", 10, "bold")).grid(row=4, column=0, sticky="w", pady=5)
+    tk.Label(info_frame, text=pip_version_result).grid(row=4, column=1, sticky="w", pady=5)
+    
+    tk.Label(info_frame, text="已安装包数量:", font=("Arial", 10, "bold")).grid(row=5, column=0, sticky="w", pady=5)
+    tk.Label(info_frame, text=str(package_count)).grid(row=5, column=1, sticky="w", pady=5)
+
+def install_error_text(e, max_lines=5):
+    """提取安装失败的原因：pip 输出的最后几行，或异常本身"""
+    output = getattr(e, "output", None)
+    if output:
+        lines = [line for line in output.strip().splitlines() if line.strip()]
+        return "\n".join(lines[-max_lines:])
+    return f"{type(e).__name__}: {e}"
+
+def install_to_all_environments():
+    packages = simpledialog.askstring("批量安装", "请输入要安装到所有环境的包名（空格分隔）:")
+    if not packages:
+        return
+    packages = packages.split()
+
+    progress_window = tk.Toplevel(root)
+    progress_window.title("批量安装中")
+    progress_window.geometry("400x100")
+    progress_label = tk.Label(progress_window, text=f"正在向 {len(all_environments)} 个环境安装...")
+    progress_label.pack(pady=20)
+
+    start = time.perf_counter()
+    futures = [(env, pip_install_future(env["path"], packages)) for env in all_environments]
+    results = {}  # 环境序号 -> None（成功）或错误信息；环境名称可能重复，不能用作键
+
+    def finish():
+        if len(results) < len(futures):
+            progress_label.config(text=f"已完成 {len(results)}/{len(futures)} 个环境...")
+            return
+        progress_window.destroy()
+        failed = [(futures[i][0], error) for i, error in sorted(results.items()) if error is not None]
+        summary = f"{len(futures) - len(failed)}/{len(futures)} 个环境安装成功，用时 {time.perf_counter() - start:.1f}s"
+        if failed:
+            details = "\n\n".join(f"{env['name']} ({env['path']}):\n{error}" for env, error in failed)
+            messagebox.showerror("部分失败", summary + "\n\n" + details)
+        else:
+            messagebox.showinfo("成功", summary)
+        refresh_packages()
+
+    for i, (env, future) in enumerate(futures):
+        def on_success(output, i=i):
+            results[i] = None
+            finish()
+
+        def on_error(e, i=i):
+            results[i] = install_error_text(e)
+            finish()
+        when_done(future, on_success, on_error)
+
+def clean_wheelhouse():
+    limit = simpledialog.askinteger(
+        "清理缓存",
+        f"缓存目录: {wheelhouse.path}\n当前大小: {wheelhouse.size() / 1024 ** 2:.1f} MB\n"
+        "请输入保留上限 (MB):",
+        initialvalue=wheelhouse.max_bytes // 1024 ** 2, minvalue=0)
+    if limit is None:
+        return
+    wheelhouse.max_bytes = limit * 1024 ** 2
+    removed = wheelhouse.evict()
+    if removed is None:
+        messagebox.showinfo("清理缓存", "有安装正在使用缓存，将在安装全部结束后清理")
+        return
+    messagebox.showinfo("清理缓存", f"已删除 {removed} 个 wheel，当前大小 {wheelhouse.size() / 1024 ** 2:.1f} MB")
+
+def show_command_timings():
+    timing_window = tk.Toplevel(root)
+    timing_window.title("命令耗时记录")
+    timing_window.geometry("700x400")
+
+    text_area = tk.Text(timing_window, wrap=tk.NONE)
+    text_area.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+    for record in reversed(executor.timings()):
+        status = "超时/异常" if record["returncode"] is None else f"退出码 {record['returncode']}"
+        text_area.insert(tk.END, f"{record['elapsed']:7.2f}s  {status:8}  {' '.join(record['cmd'])}\n")
+    text_area.config(state=tk.DISABLED)
+
 root = tk.Tk()
 root.title("Python 包管理器")
 root.geometry("800x600")
@@ -290,6 +642,9 @@ env_combobox.bind("<<ComboboxSelected>>", change_environment)
 env_info_button = tk.Button(toolbar_frame, text="环境信息", command=show_env_info)
 env_info_button.pack(side=tk.LEFT, padx=5)
 
+timing_button = tk.Button(toolbar_frame, text="命令耗时", command=show_command_timings)
+timing_button.pack(side=tk.LEFT, padx=5)
+
 search_label = tk.Label(toolbar_frame, text="搜索:")
 search_label.pack(side=tk.LEFT, padx=5)
 
@@ -309,6 +664,19 @@ update_button.pack(side=tk.RIGHT, padx=5)
 install_button = tk.Button(toolbar_frame, text="安装", command=install_package)
 install_button.pack(side=tk.RIGHT, padx=5)
 
+cache_frame = tk.Frame(root)
+cache_frame.pack(fill=tk.X, padx=10)
+
+use_wheelhouse = tk.BooleanVar(value=True)
+wheelhouse_check = tk.Checkbutton(cache_frame, text="使用本地 wheel 缓存安装", variable=use_wheelhouse)
+wheelhouse_check.pack(side=tk.LEFT, padx=5)
+
+batch_install_button = tk.Button(cache_frame, text="安装到所有环境", command=install_to_all_environments)
+batch_install_button.pack(side=tk.LEFT, padx=5)
+
+clean_cache_button = tk.Button(cache_frame, text="清理缓存", command=clean_wheelhouse)
+clean_cache_button.pack(side=tk.LEFT, padx=5)
+
 columns = ("包名", "版本")
 treeview = ttk.Treeview(root, columns=columns, show='headings')
 
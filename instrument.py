@@ -0,0 +1,141 @@
+"""
+轻量级计时与性能分析工具
+各脚本的入口按需引入，统一输出可比较的耗时数据
+
+环境变量:
+    PYTOOLS_TRACE=路径     启用计时，span / 计数器以 JSON Lines 追加写入该文件（"-" 表示标准错误）
+    PYTOOLS_PROFILE=目录   启用 cProfile，profiled() 包裹的代码段分别保存为 .prof 文件
+
+未设置时 span() 返回共享的空上下文，timed() 直接返回原函数，几乎没有额外开销
+"""
+
+import os
+import sys
+import time
+import atexit
+import functools
+import threading
+from contextlib import contextmanager
+
+TRACE_PATH = os.environ.get("PYTOOLS_TRACE")
+PROFILE_DIR = os.environ.get("PYTOOLS_PROFILE")
+ENABLED = bool(TRACE_PATH)
+
+_lock = threading.Lock()
+_sink = None
+_counters = {}
+
+
+def _write(record):
+    global _sink
+    import json  # 仅在启用计时后才需要
+    record["pid"] = os.getpid()
+    line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+    with _lock:
+        if _sink is None:
+            _sink = sys.stderr if TRACE_PATH == "-" else open(TRACE_PATH, "a", encoding="utf-8")
+        _sink.write(line)
+        _sink.flush()
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **fields):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """一次命名的计时区间，退出时写出 {"type": "span", "name", "ms", ...}"""
+
+    __slots__ = ("name", "fields", "start")
+
+    def __init__(self, name, fields):
+        self.name = name
+        self.fields = fields
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter_ns() - self.start
+        record = {"type": "span", "name": self.name, "ts": time.time(), "ms": elapsed / 1e6}
+        if self.fields:
+            record.update(self.fields)
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        _write(record)
+        return False
+
+    def set(self, **fields):
+        """在区间内补充字段（如结果大小、命中与否）"""
+        self.fields.update(fields)
+
+
+def span(name, **fields):
+    """计时上下文: with span("pip.list", env=...): ..."""
+    if not ENABLED:
+        return _NULL_SPAN
+    return Span(name, fields)
+
+
+def record(name, seconds, **fields):
+    """写出一条已自行测得耗时的 span 记录"""
+    if ENABLED:
+        _write({"type": "span", "name": name, "ts": time.time(), "ms": seconds * 1000, **fields})
+
+
+def timed(name=None):
+    """函数计时装饰器；未启用时原样返回被装饰的函数"""
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+        span_name = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with Span(span_name, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def count(name, n=1):
+    """累加计数器，进程退出时统一写出"""
+    if ENABLED:
+        with _lock:
+            _counters[name] = _counters.get(name, 0) + n
+
+
+@contextmanager
+def profiled(name):
+    """设置 PYTOOLS_PROFILE 时用 cProfile 采集代码段，保存为 <目录>/<name>-<pid>-<时间>.prof"""
+    if not PROFILE_DIR:
+        yield
+        return
+    import cProfile
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        profiler.dump_stats(os.path.join(PROFILE_DIR, f"{name}-{os.getpid()}-{int(time.time())}.prof"))
+
+
+def _flush_counters():
+    if _counters:
+        _write({"type": "counters", "ts": time.time(), "counters": dict(_counters)})
+
+
+if ENABLED:
+    atexit.register(_flush_counters)
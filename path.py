@@ -1,13 +1,227 @@
 import os
+import sys
+import json
+import time
+import argparse
 
-# 获取环境变量 PATH 的值
-path_value = os.environ.get('PATH')
-
-if path_value:
-    print("环境变量 PATH 的值为:")
-    print(path_value)
-    with open('path.txt', 'w') as f:
-        f.write(path_value)
-        f.close()
-else:
-    print("未找到环境变量 PATH。")
\ No newline at end of file
+INDEX_FILE = os.path.join(os.path.expanduser("~"), ".path_index.json")
+IS_WINDOWS = os.name == 'nt'
+
+
+def is_executable(entry):
+    try:
+        if not entry.is_file():
+            return False
+    except OSError:
+        return False
+    if IS_WINDOWS:
+        return os.path.splitext(entry.name)[1].lower() in pathext()
+    return os.access(entry.path, os.X_OK)
+
+
+def is_usable(path):
+    """按路径确认文件仍存在且可执行"""
+    if not os.path.isfile(path):
+        return False
+    if IS_WINDOWS:
+        return os.path.splitext(path)[1].lower() in pathext()
+    return os.access(path, os.X_OK)
+
+
+def pathext():
+    return [e.lower() for e in os.environ.get('PATHEXT', '.COM;.EXE;.BAT;.CMD').split(';') if e]
+
+
+def normalize(directory):
+    """用于判断重复目录的规范化路径（解析符号链接，如 /bin -> /usr/bin）"""
+    return os.path.normcase(os.path.realpath(os.path.expanduser(directory)))
+
+
+class PathIndex:
+    """
+    PATH 可执行文件索引
+    - 每个目录扫描一次，结果连同目录 mtime 持久化到 JSON 文件
+    - 之后只重新扫描 mtime 发生变化的目录
+    - which 查询直接查内存中的 名称 -> 位置列表 映射
+    局限: 目录 mtime 只在增删、重命名文件时变化。对已有文件 chmod +x，或在 mtime 精度较粗的
+    文件系统上与上次扫描同一时刻新增的文件，都不会触发重新扫描。因此 which 返回前逐个确认命中
+    仍然可执行；索引中没有命中时按 PATH 顺序直接检查各目录。但 all=True 时若索引已有命中，
+    以及新变为可执行的文件遮蔽已有命中的情况，仍需 index --rebuild 才能反映
+    """
+
+    def __init__(self, index_file=INDEX_FILE):
+        self.index_file = index_file
+        self.dirs = {}       # 目录 -> {"mtime": float, "names": [...]}
+        self.path_dirs = []  # 当前 PATH 中的目录（保持顺序）
+        self.missing = []
+        self.duplicates = []
+        self.lookup = {}     # 名称 -> [完整路径, ...]，按 PATH 优先级排序
+        self.order = {}      # 目录 -> PATH 中的位置
+        self.active = []     # 实际存在且去重后的 PATH 目录（保持顺序）
+        self.rescanned = 0
+
+    def load(self):
+        try:
+            with open(self.index_file, encoding='utf-8') as f:
+                self.dirs = json.load(f).get("dirs", {})
+        except (OSError, ValueError):
+            self.dirs = {}
+        return self
+
+    def save(self):
+        tmp = self.index_file + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({"dirs": self.dirs}, f)
+        os.replace(tmp, self.index_file)
+
+    def scan_dir(self, directory):
+        names = []
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if is_executable(entry):
+                        names.append(entry.name)
+        except OSError:
+            pass
+        return names
+
+    def refresh(self, path_value=None, force=False):
+        """根据 PATH 更新索引，只重新扫描新增或 mtime 变化的目录"""
+        if path_value is None:
+            path_value = os.environ.get('PATH', '')
+        self.path_dirs = [d for d in path_value.split(os.pathsep) if d]
+        self.missing = []
+        self.duplicates = []
+        self.rescanned = 0
+
+        seen = set()
+        active = []
+        for directory in self.path_dirs:
+            key = normalize(directory)
+            if key in seen:
+                self.duplicates.append(directory)
+                continue
+            seen.add(key)
+            try:
+                mtime = os.stat(directory).st_mtime
+            except OSError:
+                self.missing.append(directory)
+                continue
+            cached = self.dirs.get(directory)
+            if force or cached is None or cached["mtime"] != mtime:
+                self.dirs[directory] = {"mtime": mtime, "names": self.scan_dir(directory)}
+                self.rescanned += 1
+            active.append(directory)
+
+        # 不在当前 PATH 中的目录不再保留
+        self.dirs = {d: self.dirs[d] for d in active}
+        self.active = active
+
+        # dirname(join(d, name)) 与 d 的写法可能不同（如末尾斜杠），统一用前者作键
+        self.order = {os.path.dirname(os.path.join(d, "x")): i for i, d in enumerate(active)}
+        self.lookup = {}
+        for directory in active:
+            for name in self.dirs[directory]["names"]:
+                key = name.lower() if IS_WINDOWS else name
+                self.lookup.setdefault(key, []).append(os.path.join(directory, name))
+        return self
+
+    def which(self, name, all=False):
+        """返回第一个（或全部）匹配的可执行文件路径"""
+        if IS_WINDOWS:
+            name = name.lower()
+            candidates = [name] if os.path.splitext(name)[1] in pathext() else \
+                [name + ext for ext in pathext()]
+        else:
+            candidates = [name]
+        if all:
+            found = [p for c in candidates for p in self.lookup.get(c, []) if is_usable(p)]
+            return found or self.scan(candidates, all=True)
+        # Windows 下同一目录内按 PATHEXT 顺序优先，目录顺序优先于扩展名
+        found = [p for p in (next((p for p in self.lookup.get(c, []) if is_usable(p)), None)
+                             for c in candidates) if p]
+        if not found:
+            return self.scan(candidates)
+        if len(found) == 1:
+            return found[0]
+        return min(found, key=lambda p: self.order.get(os.path.dirname(p), len(self.order)))
+
+    def scan(self, candidates, all=False):
+        """索引未命中时按 PATH 顺序直接检查各目录（处理 mtime 未变化的新增或新变为可执行的文件）"""
+        found = []
+        for directory in self.active:
+            for name in candidates:
+                path = os.path.join(directory, name)
+                if is_usable(path):
+                    if not all:
+                        return path
+                    found.append(path)
+        return found if all else None
+
+    def shadowed(self):
+        """返回被 PATH 中更靠前的同名文件遮蔽的可执行文件: 名称 -> [生效路径, 被遮蔽路径...]"""
+        return {name: paths for name, paths in self.lookup.items() if len(paths) > 1}
+
+
+def dump_path():
+    # 获取环境变量 PATH 的值
+    path_value = os.environ.get('PATH')
+
+    if path_value:
+        print("环境变量 PATH 的值为:")
+        print(path_value)
+        with open('path.txt', 'w') as f:
+            f.write(path_value)
+    else:
+        print("未找到环境变量 PATH。")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PATH 查看与可执行文件索引工具")
+    parser.add_argument("--index-file", default=INDEX_FILE, help="索引文件位置")
+    sub = parser.add_subparsers(dest="command")
+    p_which = sub.add_parser("which", help="从索引中查找可执行文件")
+    p_which.add_argument("names", nargs="+")
+    p_which.add_argument("-a", "--all", action="store_true", help="列出所有匹配位置")
+    p_index = sub.add_parser("index", help="更新索引并报告遮蔽、缺失和重复的目录")
+    p_index.add_argument("--rebuild", action="store_true", help="忽略 mtime 重新扫描所有目录")
+    args = parser.parse_args(argv)
+
+    if args.command is None:
+        dump_path()
+        return 0
+
+    start = time.perf_counter()
+    index = PathIndex(args.index_file).load().refresh(force=getattr(args, "rebuild", False))
+    if index.rescanned:
+        index.save()
+    elapsed = time.perf_counter() - start
+
+    if args.command == "which":
+        status = 0
+        for name in args.names:
+            t = time.perf_counter()
+            result = index.which(name, all=args.all)
+            query_us = (time.perf_counter() - t) * 1e6
+            if not result:
+                print(f"{name}: 未找到", file=sys.stderr)
+                status = 1
+                continue
+            for path in (result if args.all else [result]):
+                print(path)
+            print(f"  (查询 {query_us:.1f}µs)", file=sys.stderr)
+        return status
+
+    print(f"PATH 中共 {len(index.path_dirs)} 个目录, 重新扫描 {index.rescanned} 个, "
+          f"索引 {len(index.lookup)} 个可执行文件, 用时 {elapsed * 1000:.1f}ms")
+    for directory in index.missing:
+        print(f"缺失目录: {directory}")
+    for directory in index.duplicates:
+        print(f"重复目录: {directory}")
+    for name, paths in sorted(index.shadowed().items()):
+        print(f"遮蔽: {name}: {paths[0]} 遮蔽了 {', '.join(paths[1:])}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
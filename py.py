@@ -1,18 +1,433 @@
 import tkinter as tk
 import random
+import sys
+import time
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import instrument  # 计时埋点，设置 PYTOOLS_TRACE 后生效
+
+# 向量化批量环境需要 numpy，图形界面与单局引擎不依赖它；首次使用时才导入，不拖慢界面启动
+np = None
+
+
+def load_numpy():
+    """导入 numpy 并赋给模块级的 np；未安装时给出安装提示"""
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            raise RuntimeError("BatchSnakeEnv 需要 numpy，请先执行: pip install numpy") from None
+        np = numpy
+    return np
+
+# 方向 -> 坐标增量
+DIRECTIONS = {
+    'Right': (1, 0),
+    'Left': (-1, 0),
+    'Up': (0, -1),
+    'Down': (0, 1),
+}
+OPPOSITE = {'Right': 'Left', 'Left': 'Right', 'Up': 'Down', 'Down': 'Up'}
+
+# 初始蛇身占据中心及其左侧两格 (width // 2 - 2 .. width // 2)，宽度至少为 4
+MIN_WIDTH = 4
+MIN_HEIGHT = 1
+
+
+def check_board_size(width, height):
+    """棋盘过小时初始蛇身会落到棋盘外，直接报错"""
+    if width < MIN_WIDTH or height < MIN_HEIGHT:
+        raise ValueError(f"棋盘至少为 {MIN_WIDTH}x{MIN_HEIGHT}，当前为 {width}x{height}")
+
+
+class SnakeEngine:
+    """
+    与界面无关的贪吃蛇状态机（移动、碰撞、增长、计分）
+    可在无显示环境下运行，供自动玩家训练与评估使用
+    """
+
+    def __init__(self, width=20, height=20, seed=None):
+        check_board_size(width, height)
+        self.width = width
+        self.height = height
+        self.rng = random.Random(seed)
+        self.reset()
+
+    def reset(self):
+        cx, cy = self.width // 2, self.height // 2
+        # 蛇身用 deque 存储（头部在左端），occupied 集合用于 O(1) 碰撞检测
+        self.snake_coords = deque([(cx, cy), (cx - 1, cy), (cx - 2, cy)])
+        self.occupied = set(self.snake_coords)
+        # 空闲格子列表 + 位置索引，支持 O(1) 取出/放回和随机选取
+        self.free_cells = [(x, y) for x in range(self.width) for y in range(self.height)
+                           if (x, y) not in self.occupied]
+        self.free_index = {cell: i for i, cell in enumerate(self.free_cells)}
+        self.direction = 'Right'
+        self.score = 0
+        self.steps = 0
+        self.done = False
+        # 上一步被移除的尾部格子（未增长时），供界面做增量绘制
+        self.last_tail = None
+        self.food = self.new_food()
+
+    def change_direction(self, new_dir):
+        """修改方向，不允许直接掉头；返回是否生效"""
+        if new_dir in DIRECTIONS and OPPOSITE[new_dir] != self.direction:
+            self.direction = new_dir
+            return True
+        return False
+
+    def occupy_cell(self, cell):
+        """将格子从空闲列表中移除（与末尾元素交换后弹出）"""
+        i = self.free_index.pop(cell)
+        last = self.free_cells.pop()
+        if last != cell:
+            self.free_cells[i] = last
+            self.free_index[last] = i
+        self.occupied.add(cell)
+
+    def release_cell(self, cell):
+        """将格子放回空闲列表"""
+        self.occupied.discard(cell)
+        self.free_index[cell] = len(self.free_cells)
+        self.free_cells.append(cell)
+
+    def new_food(self):
+        # 直接从空闲格子中随机选取，棋盘几乎填满时也是常数时间
+        if not self.free_cells:
+            return None
+        return self.rng.choice(self.free_cells)
+
+    def step(self):
+        """
+        推进一个时间步
+        返回:
+            bool: 本步是否吃到食物；游戏结束时 self.done 置为 True
+        """
+        if self.done:
+            return False
+
+        dx, dy = DIRECTIONS[self.direction]
+        x, y = self.snake_coords[0]
+        x += dx
+        y += dy
+        head = (x, y)
+        self.steps += 1
+        self.last_tail = None
+
+        # 碰撞检测
+        if (x < 0 or x >= self.width or
+            y < 0 or y >= self.height or
+            head in self.occupied):
+            self.done = True
+            return False
+
+        self.snake_coords.appendleft(head)
+        self.occupy_cell(head)
+
+        # 食物检测
+        if head == self.food:
+            self.score += 1
+            self.food = self.new_food()
+            if self.food is None:
+                # 棋盘已被填满
+                self.done = True
+            return True
+
+        self.last_tail = self.snake_coords.pop()
+        self.release_cell(self.last_tail)
+        return False
+
+
+def greedy_policy(engine):
+    """简单的自动玩家：在不会立即撞死的方向中选择离食物最近的一个"""
+    hx, hy = engine.snake_coords[0]
+    fx, fy = engine.food
+    best, best_dist = None, None
+    for name, (dx, dy) in DIRECTIONS.items():
+        if name == OPPOSITE[engine.direction]:
+            continue
+        nx, ny = hx + dx, hy + dy
+        if (nx < 0 or nx >= engine.width or ny < 0 or ny >= engine.height or
+                (nx, ny) in engine.occupied):
+            continue
+        dist = abs(fx - nx) + abs(fy - ny)
+        if best_dist is None or dist < best_dist:
+            best, best_dist = name, dist
+    return best or engine.direction
+
+
+def run_game(seed, width=20, height=20, max_steps=100000):
+    """以给定种子运行一局无界面游戏，返回结果统计"""
+    engine = SnakeEngine(width, height, seed=seed)
+    while not engine.done and engine.steps < max_steps:
+        engine.change_direction(greedy_policy(engine))
+        engine.step()
+    return {
+        "seed": seed,
+        "score": engine.score,
+        "steps": engine.steps,
+        "length": len(engine.snake_coords),
+    }
+
+
+def _run_game_args(args):
+    return run_game(*args)
+
+
+def run_batch(seeds, width=20, height=20, max_steps=100000, processes=None):
+    """多进程并行运行多局带种子的游戏，结果顺序与 seeds 一致"""
+    jobs = [(seed, width, height, max_steps) for seed in seeds]
+    if processes == 1:
+        return [_run_game_args(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return list(executor.map(_run_game_args, jobs, chunksize=max(1, len(jobs) // 64)))
+
+
+def benchmark(games=200, width=20, height=20, max_steps=100000, processes=None):
+    """分别测量单进程与多进程下的步数吞吐（steps/sec）"""
+    seeds = list(range(games))
+
+    start = time.perf_counter()
+    results = run_batch(seeds, width, height, max_steps, processes=1)
+    elapsed = time.perf_counter() - start
+    total_steps = sum(r["steps"] for r in results)
+    print(f"单进程: {games} 局, {total_steps} 步, 用时 {elapsed:.3f}s, "
+          f"{total_steps / elapsed:,.0f} steps/sec")
+
+    start = time.perf_counter()
+    results = run_batch(seeds, width, height, max_steps, processes=processes)
+    elapsed = time.perf_counter() - start
+    total_steps = sum(r["steps"] for r in results)
+    print(f"多进程: {games} 局, {total_steps} 步, 用时 {elapsed:.3f}s, "
+          f"{total_steps / elapsed:,.0f} steps/sec")
+
+    avg_score = sum(r["score"] for r in results) / len(results)
+    print(f"平均得分: {avg_score:.2f}")
+    return results
+
+
+# 批量环境中的方向编号与 DIRECTIONS 的顺序一致: 0=Right 1=Left 2=Up 3=Down
+DIRECTION_NAMES = list(DIRECTIONS)
+
+
+class BatchSnakeEnv:
+    """
+    基于 numpy 的向量化多局贪吃蛇环境，规则与 SnakeEngine.step 一致
+    - occupied: (N, H*W) 布尔占用表
+    - body: (N, H*W) 环形缓冲区，按从尾到头的顺序记录蛇身格子编号
+    一次 step() 同时推进全部 N 局，返回奖励和结束标志
+    """
+
+    def __init__(self, num_games, width=20, height=20, seed=None, autoreset=True):
+        check_board_size(width, height)
+        load_numpy()
+        self.n = num_games
+        self.width = width
+        self.height = height
+        self.cells = width * height
+        self.autoreset = autoreset
+        self.rng = np.random.default_rng(seed)
+
+        self.dx = np.array([DIRECTIONS[d][0] for d in DIRECTION_NAMES], dtype=np.int64)
+        self.dy = np.array([DIRECTIONS[d][1] for d in DIRECTION_NAMES], dtype=np.int64)
+        self.opposite = np.array([DIRECTION_NAMES.index(OPPOSITE[d]) for d in DIRECTION_NAMES],
+                                 dtype=np.int64)
+
+        self.occupied = np.zeros((self.n, self.cells), dtype=bool)
+        self.body = np.zeros((self.n, self.cells), dtype=np.int64)
+        self.head_ptr = np.zeros(self.n, dtype=np.int64)
+        self.length = np.zeros(self.n, dtype=np.int64)
+        self.head_x = np.zeros(self.n, dtype=np.int64)
+        self.head_y = np.zeros(self.n, dtype=np.int64)
+        self.direction = np.zeros(self.n, dtype=np.int64)
+        self.food = np.zeros(self.n, dtype=np.int64)
+        self.score = np.zeros(self.n, dtype=np.int64)
+        self.steps = np.zeros(self.n, dtype=np.int64)
+        self.done = np.zeros(self.n, dtype=bool)
+        self.reset()
+
+    def reset(self, mask=None):
+        """重置被 mask 选中的对局（默认全部），初始状态与 SnakeEngine.reset 相同"""
+        idx = np.arange(self.n) if mask is None else np.flatnonzero(mask)
+        if idx.size == 0:
+            return
+        cx, cy = self.width // 2, self.height // 2
+        start = np.array([cy * self.width + cx - 2, cy * self.width + cx - 1, cy * self.width + cx])
+
+        self.occupied[idx] = False
+        self.occupied[idx[:, None], start[None, :]] = True
+        self.body[idx, :3] = start
+        self.head_ptr[idx] = 2
+        self.length[idx] = 3
+        self.head_x[idx] = cx
+        self.head_y[idx] = cy
+        self.direction[idx] = DIRECTION_NAMES.index('Right')
+        self.score[idx] = 0
+        self.steps[idx] = 0
+        self.done[idx] = False
+        self.place_food(idx)
+
+    def place_food(self, idx):
+        """为 idx 中的对局在空闲格子里均匀随机放置食物；没有空闲格子时返回 False"""
+        keys = self.rng.random((idx.size, self.cells))
+        keys[self.occupied[idx]] = -1.0
+        self.food[idx] = keys.argmax(axis=1)
+        return ~self.occupied[idx, self.food[idx]]
+
+    def step(self, actions=None):
+        """
+        推进所有未结束的对局一步
+        参数:
+            actions: 长度为 N 的方向编号数组，-1 表示保持当前方向；掉头会被忽略
+        返回:
+            (rewards, dones): 吃到食物 +1，死亡 -1；dones 为本步结束的对局
+        """
+        alive = ~self.done
+        if actions is not None:
+            actions = np.asarray(actions, dtype=np.int64)
+            valid = (actions >= 0) & (actions != self.opposite[self.direction])
+            self.direction = np.where(valid & alive, actions, self.direction)
+
+        nx = self.head_x + self.dx[self.direction]
+        ny = self.head_y + self.dy[self.direction]
+        out = (nx < 0) | (nx >= self.width) | (ny < 0) | (ny >= self.height)
+        cell = np.where(out, 0, ny * self.width + nx)
+        rows = np.arange(self.n)
+        hit = out | self.occupied[rows, cell]
+
+        dead = alive & hit
+        moving = alive & ~hit
+        ate = moving & (cell == self.food)
+        self.steps += alive
+
+        m = np.flatnonzero(moving)
+        self.head_x[m] = nx[m]
+        self.head_y[m] = ny[m]
+        self.head_ptr[m] = (self.head_ptr[m] + 1) % self.cells
+        self.body[m, self.head_ptr[m]] = cell[m]
+        self.occupied[m, cell[m]] = True
+
+        # 未吃到食物的对局移除尾部
+        t = np.flatnonzero(moving & ~ate)
+        tail = self.body[t, (self.head_ptr[t] - self.length[t]) % self.cells]
+        self.occupied[t, tail] = False
+
+        e = np.flatnonzero(ate)
+        self.length[e] += 1
+        self.score[e] += 1
+        if e.size:
+            # 棋盘已被填满的对局结束
+            full = e[~self.place_food(e)]
+            self.done[full] = True
+
+        rewards = ate.astype(np.float32) - dead.astype(np.float32)
+        self.done |= dead
+        dones = dead | (ate & self.done)
+        if self.autoreset:
+            self.reset(dones)
+        return rewards, dones
+
+    def snake_cells(self, i):
+        """返回第 i 局的蛇身格子坐标列表（头部在前），便于与 SnakeEngine 对照"""
+        ptr = (self.head_ptr[i] - np.arange(self.length[i])) % self.cells
+        return [(int(c) % self.width, int(c) // self.width) for c in self.body[i, ptr]]
+
+
+def crosscheck_batch(num_games=64, steps=2000, width=10, height=10, seed=0):
+    """
+    以相同的动作序列分别推进 BatchSnakeEnv 和 SnakeEngine，逐步比对状态
+    食物位置取自批量环境，并同步给单局引擎
+    """
+    load_numpy()
+    env = BatchSnakeEnv(num_games, width, height, seed=seed, autoreset=False)
+    engines = [SnakeEngine(width, height) for _ in range(num_games)]
+    for i, engine in enumerate(engines):
+        engine.food = (int(env.food[i]) % width, int(env.food[i]) // width)
+
+    rng = np.random.default_rng(seed)
+    for _ in range(steps):
+        actions = rng.integers(-1, 4, size=num_games)
+        rewards, _ = env.step(actions)
+        for i, engine in enumerate(engines):
+            if engine.done:
+                continue
+            if actions[i] >= 0:
+                engine.change_direction(DIRECTION_NAMES[actions[i]])
+            ate = engine.step()
+            assert ate == (rewards[i] > 0), f"game {i}: reward mismatch"
+            assert engine.done == bool(env.done[i]), f"game {i}: done mismatch"
+            if engine.done:
+                continue
+            assert list(engine.snake_coords) == env.snake_cells(i), f"game {i}: body mismatch"
+            assert engine.score == env.score[i], f"game {i}: score mismatch"
+            if ate:
+                engine.food = (int(env.food[i]) % width, int(env.food[i]) // width)
+        if env.done.all():
+            break
+    return True
+
+
+def benchmark_batch(num_games=4096, steps=200, width=20, height=20, seed=0):
+    """对比 N 个独立 SnakeEngine 与一个 BatchSnakeEnv 的吞吐"""
+    load_numpy()
+    rng = np.random.default_rng(seed)
+    actions = rng.integers(-1, 4, size=(steps, num_games))
+
+    engines = [SnakeEngine(width, height, seed=i) for i in range(num_games)]
+    start = time.perf_counter()
+    for t in range(steps):
+        row = actions[t].tolist()
+        for engine, action in zip(engines, row):
+            if action >= 0:
+                engine.change_direction(DIRECTION_NAMES[action])
+            engine.step()
+            if engine.done:
+                engine.reset()
+    scalar = num_games * steps / (time.perf_counter() - start)
+
+    env = BatchSnakeEnv(num_games, width, height, seed=seed)
+    start = time.perf_counter()
+    for t in range(steps):
+        env.step(actions[t])
+    batch = num_games * steps / (time.perf_counter() - start)
+
+    print(f"独立引擎: {scalar:,.0f} steps/sec")
+    print(f"批量环境: {batch:,.0f} steps/sec ({batch / scalar:.1f}x)")
+    return scalar, batch
+
 
 class SnakeGame:
-    def __init__(self):
+    # 落后超过该步数时丢弃积压的时间步，避免追帧导致界面卡死
+    MAX_CATCHUP = 5
+
+    def __init__(self, width=20, height=20, cell_size=None, tick_ms=150):
+        if cell_size is None:
+            # 大棋盘自动缩小格子，使画布不超过约 800 像素
+            cell_size = max(1, min(20, 800 // max(width, height)))
+        self.cell = cell_size
+        self.tick = tick_ms / 1000
+
         self.root = tk.Tk()
         self.root.title("贪吃蛇游戏")
-        self.canvas = tk.Canvas(self.root, width=400, height=400, bg='black')
+        self.canvas = tk.Canvas(self.root, width=width * cell_size,
+                                height=height * cell_size, bg='black',
+                                highlightthickness=0)
         self.canvas.pack()
 
-        self.snake_coords = [[10, 10], [9, 10], [8, 10]]
-        self.direction = 'Right'
-        self.food = self.new_food()
-        self.score = 0
+        self.engine = SnakeEngine(width, height)
         self.game_over_flag = False
+        self.segment_items = deque()
+        self.food_item = None
+
+        # 帧率 / 单步耗时统计
+        self.frames = 0
+        self.fps = 0.0
+        self.fps_start = time.perf_counter()
+        self.tick_latency = 0.0
+        self.dropped_ticks = 0
 
         self.draw_snake()
         self.draw_food()
@@ -23,87 +438,144 @@ class SnakeGame:
         self.root.bind('<Up>', self.change_direction)
         self.root.bind('<Down>', self.change_direction)
 
-        self.root.after(150, self.move)
+        self.next_tick = time.perf_counter() + self.tick
+        self.root.after(tick_ms, self.move)
         self.root.mainloop()
 
+    def cell_rect(self, cell):
+        x1 = cell[0] * self.cell
+        y1 = cell[1] * self.cell
+        return x1, y1, x1 + self.cell, y1 + self.cell
+
     def draw_snake(self):
+        """完整重绘蛇身，仅在开局时使用"""
         self.canvas.delete("snake")
-        for segment in self.snake_coords:
-            x1 = segment[0] * 20
-            y1 = segment[1] * 20
-            x2 = x1 + 20
-            y2 = y1 + 20
-            self.canvas.create_rectangle(x1, y1, x2, y2, fill='green', tag="snake")
+        self.segment_items = deque(
+            self.canvas.create_rectangle(*self.cell_rect(segment), fill='green',
+                                         width=0, tag="snake")
+            for segment in self.engine.snake_coords
+        )
+
+    def draw_step(self, ate):
+        """增量绘制一步：新增头部方块，移除尾部方块"""
+        head = self.engine.snake_coords[0]
+        self.segment_items.appendleft(
+            self.canvas.create_rectangle(*self.cell_rect(head), fill='green',
+                                         width=0, tag="snake"))
+        if self.engine.last_tail is not None:
+            self.canvas.delete(self.segment_items.pop())
+        if ate:
+            self.draw_food()
 
     def draw_food(self):
-        x, y = self.food
-        x1, y1 = x*20, y*20
-        x2, y2 = x1+20, y1+20
-        self.canvas.create_rectangle(x1, y1, x2, y2, fill='red', tag="food")
+        if self.engine.food is None:
+            self.canvas.delete("food")
+            self.food_item = None
+            return
+        rect = self.cell_rect(self.engine.food)
+        if self.food_item is None:
+            self.food_item = self.canvas.create_rectangle(*rect, fill='red',
+                                                          width=0, tag="food")
+        else:
+            self.canvas.coords(self.food_item, *rect)
+        self.canvas.tag_raise("food")
 
     def draw_score(self):
         self.canvas.delete("score")
-        self.canvas.create_text(100, 20, text=f"得分: {self.score}", 
+        self.canvas.create_text(10, 10, anchor='nw',
+                               text=f"得分: {self.engine.score}  "
+                                    f"FPS: {self.fps:.1f}  "
+                                    f"单步: {self.tick_latency * 1000:.2f}ms  "
+                                    f"丢帧: {self.dropped_ticks}",
                                fill='white', font=('Arial', 12), tag="score")
 
     def change_direction(self, event):
-        new_dir = event.keysym
-        if (new_dir == 'Left' and self.direction != 'Right') or \
-           (new_dir == 'Right' and self.direction != 'Left') or \
-           (new_dir == 'Up' and self.direction != 'Down') or \
-           (new_dir == 'Down' and self.direction != 'Up'):
-            self.direction = new_dir
-
-    def new_food(self):
-        while True:
-            x = random.randint(0, 19)
-            y = random.randint(0, 19)
-            if [x, y] not in self.snake_coords:
-                return [x, y]
+        self.engine.change_direction(event.keysym)
 
     def move(self):
+        """
+        固定时间步主循环
+        - 按绝对时间推进，补偿绘制耗时，避免 after() 累积漂移
+        - 落后时连续推进多步，只在最后刷新一次 HUD
+        - 落后过多时丢弃积压的时间步
+        """
         if self.game_over_flag:
             return
 
-        head = list(self.snake_coords[0])
-        if self.direction == 'Right':
-            head[0] += 1
-        elif self.direction == 'Left':
-            head[0] -= 1
-        elif self.direction == 'Up':
-            head[1] -= 1
-        elif self.direction == 'Down':
-            head[1] += 1
+        now = time.perf_counter()
+        steps = 0
+        while now >= self.next_tick and steps < self.MAX_CATCHUP:
+            start = time.perf_counter()
+            ate = self.engine.step()
+            if self.engine.done:
+                self.game_over()
+                return
+            self.draw_step(ate)
+            # 指数滑动平均的单步耗时
+            self.tick_latency += (time.perf_counter() - start - self.tick_latency) * 0.1
+            self.next_tick += self.tick
+            steps += 1
 
-        # 碰撞检测
-        if (head[0] < 0 or head[0] >= 20 or 
-            head[1] < 0 or head[1] >= 20 or 
-            head in self.snake_coords):
-            self.game_over()
-            return
+        if now - self.next_tick > self.tick:
+            # 积压过多，直接丢弃并重新对齐时钟
+            behind = int((now - self.next_tick) / self.tick)
+            self.dropped_ticks += behind
+            self.next_tick += behind * self.tick
 
-        # 食物检测
-        if head == self.food:
-            self.score += 1
-            self.food = self.new_food()
-        else:
-            del self.snake_coords[-1]
-
-        self.snake_coords.insert(0, head)
-
-        self.draw_snake()
-        self.draw_food()
-        self.draw_score()
+        if steps:
+            instrument.record("snake.frame", time.perf_counter() - now, steps=steps,
+                              dropped=self.dropped_ticks)
+            self.frames += 1
+            elapsed = now - self.fps_start
+            if elapsed >= 1.0:
+                self.fps = self.frames / elapsed
+                self.frames = 0
+                self.fps_start = now
+            self.draw_score()
 
-        self.root.after(150, self.move)
+        delay = max(0, int((self.next_tick - time.perf_counter()) * 1000))
+        self.root.after(delay, self.move)
 
     def game_over(self):
         self.game_over_flag = True
         self.canvas.delete("all")
-        self.canvas.create_text(200, 200, text="游戏结束！",
+        cx = int(self.canvas['width']) // 2
+        cy = int(self.canvas['height']) // 2
+        self.canvas.create_text(cx, cy, text="游戏结束！",
                                fill='white', font=('Arial', 20))
-        self.canvas.create_text(200, 250, text=f"最终得分: {self.score}",
+        self.canvas.create_text(cx, cy + 50, text=f"最终得分: {self.engine.score}",
                                fill='white', font=('Arial', 14))
 
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="贪吃蛇游戏")
+    parser.add_argument("--width", type=int, default=20, help="棋盘宽度（格）")
+    parser.add_argument("--height", type=int, default=20, help="棋盘高度（格）")
+    parser.add_argument("--cell", type=int, default=None, help="格子像素大小（默认按棋盘自动计算）")
+    parser.add_argument("--tick", type=int, default=150, help="每步间隔（毫秒）")
+    parser.add_argument("--bench", action="store_true", help="无界面运行吞吐基准测试")
+    parser.add_argument("--batch-bench", action="store_true",
+                        help="比对并测量 numpy 向量化批量环境的吞吐")
+    parser.add_argument("--games", type=int, default=200, help="基准测试的对局数")
+    parser.add_argument("--processes", type=int, default=None, help="并行进程数（默认 CPU 核数）")
+    parser.add_argument("--max-steps", type=int, default=100000, help="每局最大步数")
+    args = parser.parse_args(argv)
+    try:
+        check_board_size(args.width, args.height)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.batch_bench:
+        crosscheck_batch()
+        print("批量环境与单局规则比对通过")
+        with instrument.span("snake.batch_bench", games=args.games), instrument.profiled("snake.batch_bench"):
+            benchmark_batch(args.games, width=args.width, height=args.height)
+    elif args.bench:
+        with instrument.span("snake.bench", games=args.games), instrument.profiled("snake.bench"):
+            benchmark(args.games, args.width, args.height, args.max_steps, args.processes)
+    else:
+        SnakeGame(args.width, args.height, args.cell, args.tick)
+
+
 if __name__ == "__main__":
-    SnakeGame()
\ No newline at end of file
+    main(sys.argv[1:])
@@ -0,0 +1,90 @@
+import asyncio
+import importlib.util
+import json
+import os
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+openai = pytest.importorskip("openai")
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_chat_module():
+    # 0.py 不是合法的模块名，按路径加载
+    spec = importlib.util.spec_from_file_location("chat_client", os.path.join(HERE, "0.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class EchoHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests = 0
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        EchoHandler.requests += 1
+        req = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        body = json.dumps({
+            "id": "cmpl", "object": "chat.completion", "created": 0, "model": req["model"],
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": "echo: " + req["messages"][-1]["content"]}}],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 2, "total_tokens": 3},
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), EchoHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    EchoHandler.requests = 0
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/v1"
+    httpd.shutdown()
+
+
+@pytest.fixture
+def chat():
+    return load_chat_module()
+
+
+def test_wrap_sync_client(chat, server, tmp_path):
+    cache = chat.ResponseCache(str(tmp_path / "cache.sqlite"))
+    client = cache.wrap(openai.OpenAI(api_key="test", base_url=server))
+    messages = [{"role": "user", "content": "hi"}]
+
+    first = client.chat.completions.create(model="m", messages=messages)
+    second = client.chat.completions.create(model="m", messages=messages)
+
+    assert first.choices[0].message.content == second.choices[0].message.content == "echo: hi"
+    assert EchoHandler.requests == 1
+    assert cache.stats()["hits"] == 1
+    cache.close()
+
+
+def test_wrap_async_client(chat, server, tmp_path):
+    cache = chat.ResponseCache(str(tmp_path / "cache.sqlite"))
+    client = cache.wrap(openai.AsyncOpenAI(api_key="test", base_url=server))
+    messages = [{"role": "user", "content": "hi"}]
+
+    async def run():
+        first = await client.chat.completions.create(model="m", messages=messages)
+        second = await client.chat.completions.create(model="m", messages=messages)
+        await client.close()
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first.choices[0].message.content == second.choices[0].message.content == "echo: hi"
+    assert EchoHandler.requests == 1
+    assert cache.stats()["hits"] == 1
+    cache.close()
@@ -0,0 +1,57 @@
+import importlib.util
+import os
+
+import pytest
+
+pytest.importorskip("openai")
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.fixture
+def chat():
+    # 0.py 不是合法的模块名，按路径加载
+    spec = importlib.util.spec_from_file_location("chat_client", os.path.join(HERE, "0.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def accumulate(previous, dropped):
+    """不做压缩、只累加文本的摘要器，用于检验摘要大小上限"""
+    return (previous or "") + " ".join(m["content"] for m in dropped)
+
+
+def test_payload_bounded_with_accumulating_summary(chat):
+    history = chat.ConversationHistory(budget=50, system="be brief", summarizer=accumulate)
+    for i in range(100):
+        history.append("user", f"question number {i} " * 3)
+        history.append("assistant", f"answer number {i} " * 3)
+        assert history.total <= history.budget
+        assert history.total == sum(history.count(m) for m in history.payload())
+
+
+def test_second_pass_drops_are_summarized(chat):
+    seen = []
+
+    def summarizer(previous, dropped):
+        seen.extend(m["content"] for m in dropped)
+        return "s" * 200
+
+    history = chat.ConversationHistory(budget=60, summarizer=summarizer)
+    contents = [f"message {i} " * 4 for i in range(10)]
+    for i, content in enumerate(contents):
+        history.append("user" if i % 2 == 0 else "assistant", content)
+
+    kept = [m["content"] for m in history.messages]
+    assert seen + kept == contents
+
+
+def test_no_leading_assistant(chat):
+    history = chat.ConversationHistory(budget=20, system="sys", summarizer=accumulate)
+    history.append("user", "x" * 40)
+    history.append("assistant", "y" * 40)
+    assert [m["role"] for m in history.payload()] == ["system", "system"]
+
+    history.append("user", "next")
+    assert [m["role"] for m in history.payload()] == ["system", "system", "user"]
@@ -0,0 +1,100 @@
+import importlib.util
+import json
+import os
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+openai = pytest.importorskip("openai")
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_chat_module():
+    # 0.py 不是合法的模块名，按路径加载
+    spec = importlib.util.spec_from_file_location("chat_client", os.path.join(HERE, "0.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class StreamHandler(BaseHTTPRequestHandler):
+    """按 events 依次返回 SSE 事件；记录收到的请求和建立的连接数"""
+    protocol_version = "HTTP/1.1"
+    events = []
+    received = []
+    connections = 0
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        StreamHandler.connections += 1
+
+    def do_POST(self):
+        StreamHandler.received.append(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+        body = "".join(f"data: {json.dumps(event)}\n\n" for event in StreamHandler.events)
+        body = (body + "data: [DONE]\n\n").encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def delta(text):
+    return {"id": "c", "object": "chat.completion.chunk", "created": 0, "model": "m",
+            "choices": [{"index": 0, "delta": {"content": text}, "finish_reason": None}]}
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StreamHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    StreamHandler.events = [delta("你好"), delta("，世界")]
+    StreamHandler.received = []
+    StreamHandler.connections = 0
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/v1"
+    httpd.shutdown()
+
+
+@pytest.fixture
+def chat():
+    return load_chat_module()
+
+
+def roles(messages):
+    return [m["role"] for m in messages]
+
+
+def test_ask_streams_and_reuses_connection(chat, server):
+    with chat.ChatSession(api_key="test", base_url=server) as session:
+        assert session.ask("hi", out=None) == "你好，世界"
+        assert session.ask("again", out=None) == "你好，世界"
+
+    assert roles(StreamHandler.received[1]["messages"]) == ["user", "assistant", "user"]
+    assert StreamHandler.connections == 1
+    assert len(session.stats) == 2
+
+
+def test_error_event_raises_and_rolls_back(chat, server):
+    with chat.ChatSession(api_key="test", base_url=server) as session:
+        StreamHandler.events = [{"error": {"message": "overloaded", "type": "server_error"}}]
+        with pytest.raises(openai.APIError, match="overloaded"):
+            session.ask("hi", out=None)
+        assert session.messages == []
+
+        StreamHandler.events = [delta("ok")]
+        assert session.ask("hi again", out=None) == "ok"
+
+    assert roles(StreamHandler.received[1]["messages"]) == ["user"]
+
+
+def test_empty_reply_not_recorded(chat, server):
+    with chat.ChatSession(api_key="test", base_url=server) as session:
+        StreamHandler.events = []
+        assert session.ask("hi", out=None) == ""
+        assert session.messages == []
@@ -0,0 +1,89 @@
+import importlib.util
+import os
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+pytestmark = pytest.mark.skipif(os.name == 'nt', reason="依赖可执行权限位和符号链接")
+
+
+@pytest.fixture(scope="module")
+def pathmod():
+    spec = importlib.util.spec_from_file_location("path_index", os.path.join(HERE, "path.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_file(directory, name, executable=True):
+    path = os.path.join(directory, name)
+    with open(path, 'w') as f:
+        f.write("#!/bin/sh\n")
+    os.chmod(path, 0o755 if executable else 0o644)
+    return path
+
+
+@pytest.fixture
+def tree(tmp_path):
+    first, second = tmp_path / "first", tmp_path / "second"
+    first.mkdir()
+    second.mkdir()
+    make_file(first, "tool")
+    make_file(second, "tool")
+    make_file(second, "other")
+    make_file(second, "data.txt", executable=False)
+    os.symlink(first, tmp_path / "link")
+    path_value = os.pathsep.join([
+        str(first), str(second), str(tmp_path / "missing"),
+        str(first) + os.sep,        # 同一目录的不同写法
+        str(tmp_path / "link"),     # 指向 first 的符号链接
+    ])
+    return tmp_path, path_value
+
+
+def test_index_reports_shadowed_missing_and_duplicates(pathmod, tree):
+    tmp_path, path_value = tree
+    index = pathmod.PathIndex(str(tmp_path / "index.json")).refresh(path_value)
+
+    first, second = str(tmp_path / "first"), str(tmp_path / "second")
+    assert index.which("tool") == os.path.join(first, "tool")
+    assert index.which("tool", all=True) == [os.path.join(first, "tool"), os.path.join(second, "tool")]
+    assert index.which("other") == os.path.join(second, "other")
+    assert index.which("data.txt") is None
+    assert index.shadowed() == {"tool": [os.path.join(first, "tool"), os.path.join(second, "tool")]}
+    assert index.missing == [str(tmp_path / "missing")]
+    assert index.duplicates == [first + os.sep, str(tmp_path / "link")]
+    assert index.rescanned == 2
+
+
+def test_saved_index_only_rescans_changed_dirs(pathmod, tree):
+    tmp_path, path_value = tree
+    index_file = str(tmp_path / "index.json")
+    pathmod.PathIndex(index_file).refresh(path_value).save()
+
+    index = pathmod.PathIndex(index_file).load().refresh(path_value)
+    assert index.rescanned == 0
+    assert index.which("other") == os.path.join(str(tmp_path / "second"), "other")
+
+    second = tmp_path / "second"
+    make_file(second, "new")
+    stat = os.stat(second)
+    os.utime(second, (stat.st_atime, stat.st_mtime + 10))
+    index = pathmod.PathIndex(index_file).load().refresh(path_value)
+    assert index.rescanned == 1
+    assert index.which("new") == os.path.join(str(second), "new")
+
+
+def test_which_checks_files_changed_without_mtime_change(pathmod, tree):
+    tmp_path, path_value = tree
+    index = pathmod.PathIndex(str(tmp_path / "index.json")).refresh(path_value)
+    first, second = str(tmp_path / "first"), str(tmp_path / "second")
+
+    # chmod +x 不改变目录 mtime，索引中没有该文件
+    os.chmod(os.path.join(second, "data.txt"), 0o755)
+    assert index.which("data.txt") == os.path.join(second, "data.txt")
+
+    # 索引中的命中失效时跳过，返回下一个位置
+    os.chmod(os.path.join(first, "tool"), 0o644)
+    assert index.which("tool") == os.path.join(second, "tool")
@@ -0,0 +1,22 @@
+import os
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+import RSA0
+
+
+def test_import_time_within_budget():
+    assert RSA0.check_import_time() is True
+
+
+def test_import_does_not_load_cryptography():
+    # 在新进程中导入，避免受本进程中其他测试已导入模块的影响
+    result = subprocess.run(
+        [sys.executable, '-c',
+         "import sys, RSA0; print(sorted(m for m in sys.modules if m.startswith('cryptography')))"],
+        cwd=HERE, capture_output=True, text=True, check=True,
+    )
+    assert result.stdout.strip() == "[]"
@@ -0,0 +1,70 @@
+import importlib.util
+import os
+import random
+import subprocess
+import sys
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.fixture(scope="module")
+def snake():
+    # py.py 与第三方包 py 同名，按路径加载
+    spec = importlib.util.spec_from_file_location("snake", os.path.join(HERE, "py.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def check_invariants(engine):
+    cells = {(x, y) for x in range(engine.width) for y in range(engine.height)}
+    body = list(engine.snake_coords)
+    assert len(set(body)) == len(body)
+    assert engine.occupied == set(body)
+    assert engine.occupied <= cells
+    # 空闲格子与蛇身互补，且位置索引与列表一致
+    assert len(engine.free_cells) == len(set(engine.free_cells))
+    assert set(engine.free_cells) | engine.occupied == cells
+    assert not set(engine.free_cells) & engine.occupied
+    assert all(engine.free_cells[i] == cell for cell, i in engine.free_index.items())
+    assert len(engine.free_index) == len(engine.free_cells)
+    if engine.food is not None:
+        assert engine.food in engine.free_index
+
+
+@pytest.mark.parametrize("width,height", [(4, 1), (4, 3), (5, 5), (8, 6)])
+def test_engine_invariants(snake, width, height):
+    rng = random.Random(width * 100 + height)
+    for seed in range(20):
+        engine = snake.SnakeEngine(width, height, seed=seed)
+        check_invariants(engine)
+        while not engine.done and engine.steps < 500:
+            if rng.random() < 0.3:
+                engine.change_direction(rng.choice(snake.DIRECTION_NAMES))
+            else:
+                engine.change_direction(snake.greedy_policy(engine))
+            engine.step()
+            check_invariants(engine)
+
+
+@pytest.mark.parametrize("width,height", [(4, 4), (5, 3), (6, 6)])
+def test_batch_env_matches_engine(snake, width, height):
+    pytest.importorskip("numpy")
+    assert snake.crosscheck_batch(num_games=16, steps=300, width=width, height=height, seed=width)
+
+
+def test_import_does_not_load_numpy():
+    code = ("import importlib.util, sys\n"
+            "spec = importlib.util.spec_from_file_location('snake', 'py.py')\n"
+            "spec.loader.exec_module(importlib.util.module_from_spec(spec))\n"
+            "print('numpy' in sys.modules)")
+    result = subprocess.run([sys.executable, '-c', code], cwd=HERE, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
+
+
+@pytest.mark.parametrize("width,height", [(2, 2), (3, 5), (20, 0)])
+def test_rejects_too_small_board(snake, width, height):
+    with pytest.raises(ValueError):
+        snake.SnakeEngine(width, height)